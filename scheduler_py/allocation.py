@@ -0,0 +1,361 @@
+import heapq
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+from .models import Cabin, Period, ActivityArea
+from .utils import get_candidate_areas, is_area_available
+
+STABLE = "stable"
+RANK_MAXIMAL = "rank_maximal"
+
+@dataclass
+class ChoiceRequest:
+    """A cabin's ranked area choices for one choice period."""
+    cabin_id: str
+    choices: List[str]
+    size: int = 1
+    priority: int = 0
+
+@dataclass
+class ChoiceAllocation:
+    """Result of allocating the choice requests of every choice period."""
+    assignments: List[Dict[str, Any]] = field(default_factory=list)
+    unassigned: List[Dict[str, Any]] = field(default_factory=list)
+    skipped: List[Dict[str, Any]] = field(default_factory=list)
+    rank_counts: Dict[int, int] = field(default_factory=dict)
+
+def allocate_choices(
+    requests: List[ChoiceRequest],
+    capacities: Dict[str, int],
+    mode: str = RANK_MAXIMAL,
+    seed: int = 0
+) -> Dict[str, str]:
+    """
+    Allocate ranked requests to areas without exceeding capacities (in `size` units).
+    Returns a mapping of cabin id to area id; unplaced cabins are left out.
+
+    - "stable": cabin-proposing deferred acceptance. Areas prefer higher cabin
+      priority, then a seeded lottery. No cabin and area would both rather be together.
+    - "rank_maximal": places as many cabins as possible at their first choice, then,
+      subject to that, as many as possible at their second, and so on, solved as one
+      min-cost flow. Ties between equally good allocations go to cabins earlier in a
+      seeded lottery. This is exact when all cabins have the same size; with mixed sizes
+      the problem is a knapsack, and cabins are only ever swapped for cabins of the same
+      size, so it may fall short.
+    """
+    lottery = list(range(len(requests)))
+    random.Random(seed).shuffle(lottery)
+    if mode == STABLE:
+        placement = _deferred_acceptance(requests, capacities, lottery)
+    elif mode == RANK_MAXIMAL:
+        placement = _rank_maximal(requests, capacities, lottery)
+    else:
+        raise ValueError(f"Unsupported choice allocation mode: {mode}")
+    return {requests[i].cabin_id: area_id for i, area_id in placement.items()}
+
+def _deferred_acceptance(requests: List[ChoiceRequest], capacities: Dict[str, int], lottery: List[int]) -> Dict[int, str]:
+    # Every area prefers cabins earlier in this order.
+    lottery_position = {r: position for position, r in enumerate(lottery)}
+    order = sorted(range(len(requests)), key=lambda i: (-requests[i].priority, lottery_position[i]))
+    rank_of = {r: position for position, r in enumerate(order)}
+
+    held: Dict[str, List[Tuple[int, int]]] = {area_id: [] for area_id in capacities}
+    load = {area_id: 0 for area_id in capacities}
+    next_choice = [0] * len(requests)
+    free = deque(order)
+    while free:
+        i = free.popleft()
+        choices = requests[i].choices
+        if next_choice[i] >= len(choices):
+            continue
+        area_id = choices[next_choice[i]]
+        next_choice[i] += 1
+        if area_id not in held:
+            free.append(i)
+            continue
+
+        heapq.heappush(held[area_id], (-rank_of[i], i))
+        load[area_id] += requests[i].size
+        while load[area_id] > capacities[area_id]:
+            _, rejected = heapq.heappop(held[area_id])
+            load[area_id] -= requests[rejected].size
+            free.append(rejected)
+
+    return {i: area_id for area_id, heap in held.items() for _, i in heap}
+
+def _rank_maximal(requests: List[ChoiceRequest], capacities: Dict[str, int], lottery: List[int]) -> Dict[int, str]:
+    # Min-cost flow by successive shortest paths over a graph whose nodes are the areas.
+    # Costs are per-rank count tuples compared lexicographically: placing a cabin at
+    # rank r costs -1 at r, and moving a placed cabin from rank a to rank b costs +1 at a
+    # and -1 at b. Cabins are interchangeable within their (size, area, rank) classes, so
+    # every path is augmented by as many cabins as its classes and end area allow.
+    position = {i: p for p, i in enumerate(lottery)}
+    ranks: List[Dict[str, int]] = []
+    for req in requests:
+        area_ranks: Dict[str, int] = {}
+        for rank, area_id in enumerate(req.choices):
+            if area_id in capacities and area_id not in area_ranks:
+                area_ranks[area_id] = rank
+        ranks.append(area_ranks)
+    max_rank = max((len(req.choices) for req in requests), default=0)
+    zero = (0,) * max_rank
+
+    def unit(rank: int, value: int) -> Tuple[int, ...]:
+        cost = [0] * max_rank
+        cost[rank] = value
+        return tuple(cost)
+
+    def add(a: Tuple[int, ...], b: Tuple[int, ...]) -> Tuple[int, ...]:
+        return tuple(x + y for x, y in zip(a, b))
+
+    entry_cost = [unit(r, -1) for r in range(max_rank)]
+    move_cost = {(a, b): add(unit(a, 1), unit(b, -1)) for a in range(max_rank) for b in range(max_rank) if a != b}
+
+    # Unplaced cabins by (size, area, rank), popped in lottery order; placed cabins are skipped lazily.
+    waiting: Dict[Tuple[int, str, int], List[Tuple[int, int]]] = {}
+    waiting_count: Dict[Tuple[int, str, int], int] = {}
+    for i in lottery:
+        for area_id, rank in ranks[i].items():
+            key = (requests[i].size, area_id, rank)
+            waiting.setdefault(key, []).append((position[i], i))
+            waiting_count[key] = waiting_count.get(key, 0) + 1
+    # Placed cabins by (size, origin, destination) and then (origin rank, destination rank).
+    movable: Dict[Tuple[int, str, str], Dict[Tuple[int, int], set]] = {}
+
+    free = dict(capacities)
+    placement: Dict[int, str] = {}
+
+    def place(i: int, area_id: str):
+        size = requests[i].size
+        origin = placement.get(i)
+        if origin is None:
+            for other, rank in ranks[i].items():
+                waiting_count[(size, other, rank)] -= 1
+        else:
+            for other, rank in ranks[i].items():
+                if other != origin:
+                    movable[(size, origin, other)][(ranks[i][origin], rank)].discard(i)
+        placement[i] = area_id
+        for other, rank in ranks[i].items():
+            if other != area_id:
+                types = movable.setdefault((size, area_id, other), {})
+                types.setdefault((ranks[i][area_id], rank), set()).add(i)
+
+    def shortest_paths(size: int):
+        dist: Dict[str, Tuple[int, ...]] = {}
+        parent: Dict[str, Tuple[Optional[str], int, int]] = {}
+        for (entry_size, area_id, rank), count in waiting_count.items():
+            if entry_size == size and count > 0 and (area_id not in dist or entry_cost[rank] < dist[area_id]):
+                dist[area_id] = entry_cost[rank]
+                parent[area_id] = (None, rank, rank)
+        edges = []
+        for (move_size, origin, destination), types in movable.items():
+            if move_size == size:
+                options = [t for t, cabins in types.items() if cabins]
+                if options:
+                    best = min(options, key=lambda t: move_cost[t])
+                    edges.append((origin, destination, best))
+        for _ in range(len(capacities)):
+            changed = False
+            for origin, destination, types in edges:
+                if origin in dist:
+                    cost = add(dist[origin], move_cost[types])
+                    if destination not in dist or cost < dist[destination]:
+                        dist[destination] = cost
+                        parent[destination] = (origin,) + types
+                        changed = True
+            if not changed:
+                break
+        return dist, parent
+
+    while True:
+        best = None
+        for size in sorted({key[0] for key, count in waiting_count.items() if count > 0}):
+            dist, parent = shortest_paths(size)
+            for area_id, cost in dist.items():
+                if cost < zero and free[area_id] >= size and (best is None or cost < best[0]):
+                    best = (cost, size, area_id, parent)
+        if best is None:
+            return placement
+
+        _, size, end, parent = best
+        hops: List[Tuple[str, str, Tuple[int, int]]] = []
+        area_id, seen = end, {end}
+        while parent[area_id][0] is not None:
+            origin, from_rank, to_rank = parent[area_id]
+            if origin in seen:
+                return placement
+            seen.add(origin)
+            hops.append((origin, area_id, (from_rank, to_rank)))
+            area_id = origin
+        start, rank = area_id, parent[area_id][1]
+
+        amount = waiting_count[(size, start, rank)]
+        if size > 0:
+            amount = min(amount, free[end] // size)
+        for origin, destination, types in hops:
+            amount = min(amount, len(movable[(size, origin, destination)][types]))
+
+        free[end] -= amount * size
+        for origin, destination, (from_rank, to_rank) in hops:
+            cabins = movable[(size, origin, destination)][(from_rank, to_rank)]
+            # Cabins moving to a better choice are taken in lottery order, and cabins
+            # moving to a worse one in reverse lottery order.
+            chosen = sorted(cabins, key=lambda i: position[i], reverse=to_rank > from_rank)[:amount]
+            for i in chosen:
+                place(i, destination)
+        queue = waiting[(size, start, rank)]
+        placed = 0
+        while placed < amount:
+            _, i = heapq.heappop(queue)
+            if i not in placement:
+                place(i, start)
+                placed += 1
+
+def build_choice_requests(config: Dict[str, Any]) -> Tuple[Dict[Tuple[int, str], List[ChoiceRequest]], List[Dict[str, Any]]]:
+    """
+    Group the configured choice requests by choice period, returning them with the
+    requests that had to be skipped.
+
+    Requests are either per cabin ({"cabinId", "periodId", "day", "choices"}) or per
+    camper (the same with a "camperId"). Camper rankings are combined into one ranking
+    per cabin by Borda count; a cabin-level request takes precedence over its campers'.
+    Choices are weighted by cabin `size` when "choiceCapacityUnit" is "campers", and
+    count one per cabin otherwise, matching how area utilization is counted.
+    """
+    cabin_by_id = {c.id: c for c in config.get("cabins", [])}
+    period_by_slot = {(p.day, p.id): p for p in config.get("periods", [])}
+    weight_by_size = config.get("choiceCapacityUnit") == "campers"
+
+    cabin_requests: Dict[Tuple[int, str, str], List[str]] = {}
+    camper_scores: Dict[Tuple[int, str, str], Dict[str, int]] = {}
+    skipped = []
+    for entry in config.get("choiceRequests", []):
+        period = period_by_slot.get((entry["day"], entry["periodId"]))
+        if entry["cabinId"] not in cabin_by_id or period is None or not period.is_choice_period:
+            skipped.append(entry)
+            continue
+        key = (entry["day"], entry["periodId"], entry["cabinId"])
+        if "camperId" in entry:
+            scores = camper_scores.setdefault(key, {})
+            for position, area_id in enumerate(entry["choices"]):
+                scores[area_id] = scores.get(area_id, 0) + len(entry["choices"]) - position
+        else:
+            cabin_requests[key] = list(entry["choices"])
+
+    for key, scores in camper_scores.items():
+        if key not in cabin_requests:
+            # Python's sort is stable, so ties keep the order areas were first ranked in.
+            cabin_requests[key] = sorted(scores, key=lambda area_id: -scores[area_id])
+
+    grouped: Dict[Tuple[int, str], List[ChoiceRequest]] = {}
+    for (day, period_id, cabin_id), choices in cabin_requests.items():
+        cabin = cabin_by_id[cabin_id]
+        grouped.setdefault((day, period_id), []).append(ChoiceRequest(
+            cabin_id=cabin_id,
+            choices=choices,
+            size=cabin.size if weight_by_size else 1,
+            priority=cabin.priority,
+        ))
+    return grouped, skipped
+
+def get_choice_capacities(
+    period: Period,
+    requests: List[ChoiceRequest],
+    config: Dict[str, Any],
+    preplaced: List[Dict[str, Any]]
+) -> Dict[str, int]:
+    """
+    Remaining capacity of each area open during a choice period, after pre-placed
+    assignments. Of each set of linked areas, only the most requested ones stay open,
+    so allocations never break linked-area exclusivity.
+    """
+    areas: List[ActivityArea] = config.get("areas", [])
+    periods = config.get("periods", [])
+    cabin_by_id = {c.id: c for c in config.get("cabins", [])}
+    weight_by_size = config.get("choiceCapacityUnit") == "campers"
+
+    used: Dict[str, int] = {}
+    for entry in preplaced:
+        cabin = cabin_by_id.get(entry["cabinId"])
+        weight = cabin.size if weight_by_size and cabin else 1
+        used[entry["areaId"]] = used.get(entry["areaId"], 0) + weight
+
+    demand: Dict[str, int] = {}
+    for request in requests:
+        if request.choices:
+            demand[request.choices[0]] = demand.get(request.choices[0], 0) + request.size
+
+    # The hard rule only checks the links of the area being assigned, so an area is
+    # closed when it links to an area in use or when an area in use links to it.
+    area_by_id = {a.id: a for a in areas}
+    taken = set(used)
+    closed = {linked_id for area_id in used if area_id in area_by_id for linked_id in area_by_id[area_id].linked_areas}
+    capacities: Dict[str, int] = {}
+    for area in sorted(areas, key=lambda a: -demand.get(a.id, 0)):
+        if area.id in closed or any(linked_id in taken for linked_id in area.linked_areas):
+            continue
+        if not is_area_available(area, periods, period.day, period.id):
+            continue
+        capacity = area.max_capacity - used.get(area.id, 0)
+        if capacity > 0:
+            capacities[area.id] = capacity
+            taken.add(area.id)
+            closed.update(area.linked_areas)
+    return capacities
+
+def allocate_choice_periods(config: Dict[str, Any]) -> ChoiceAllocation:
+    """
+    Allocate the configured choice requests for every choice period, producing
+    entries in the same shape as the "choicePeriods" config.
+    Manual overrides and fixed choicePeriods entries are kept and take capacity first.
+    """
+    mode = config.get("choiceAllocationMode", RANK_MAXIMAL)
+    seed = config.get("choiceAllocationSeed", 0)
+    cabin_by_id: Dict[str, Cabin] = {c.id: c for c in config.get("cabins", [])}
+    period_by_slot = {(p.day, p.id): p for p in config.get("periods", [])}
+    areas = config.get("areas", [])
+    periods = config.get("periods", [])
+
+    preplaced: Dict[Tuple[int, str], List[Dict[str, Any]]] = {}
+    for entry in config.get("manualOverrides", []) + config.get("choicePeriods", []):
+        preplaced.setdefault((entry["day"], entry["periodId"]), []).append(entry)
+
+    grouped, skipped = build_choice_requests(config)
+    allocation = ChoiceAllocation(skipped=skipped)
+    for (day, period_id), requests in grouped.items():
+        period = period_by_slot[(day, period_id)]
+        slot_preplaced = preplaced.get((day, period_id), [])
+        placed_cabins = {e["cabinId"] for e in slot_preplaced}
+        blackouts = {
+            b["cabinId"] for b in config.get("blackoutPeriods", [])
+            if b["day"] == day and b["periodId"] == period_id
+        }
+
+        eligible = []
+        requested_choices: Dict[str, List[str]] = {}
+        for request in requests:
+            cabin = cabin_by_id[request.cabin_id]
+            if request.cabin_id in placed_cabins or request.cabin_id in blackouts or period_id in cabin.restrictions.blackout_periods:
+                allocation.skipped.append({"cabinId": request.cabin_id, "periodId": period_id, "day": day})
+                continue
+            requested_choices[request.cabin_id] = request.choices
+            allowed = {a.id for a in get_candidate_areas(cabin, areas, periods, day, period_id)}
+            request.choices = [area_id for area_id in request.choices if area_id in allowed]
+            eligible.append(request)
+
+        capacities = get_choice_capacities(period, eligible, config, slot_preplaced)
+        placement = allocate_choices(eligible, capacities, mode, seed)
+        for request in eligible:
+            area_id = placement.get(request.cabin_id)
+            entry = {"cabinId": request.cabin_id, "periodId": period_id, "day": day}
+            if area_id is None:
+                allocation.unassigned.append(entry)
+                continue
+            entry["areaId"] = area_id
+            allocation.assignments.append(entry)
+            rank = requested_choices[request.cabin_id].index(area_id) + 1
+            allocation.rank_counts[rank] = allocation.rank_counts.get(rank, 0) + 1
+    return allocation
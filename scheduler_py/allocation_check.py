@@ -0,0 +1,101 @@
+import argparse
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from .allocation import ChoiceRequest, allocate_choices, RANK_MAXIMAL
+
+@dataclass
+class AllocationCheckReport:
+    """Result of comparing rank-maximal allocation against brute force."""
+    runs: int = 0
+    failures: List[int] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures
+
+def generate_choice_instance(seed: int, max_requests: int = 7, max_areas: int = 4) -> Tuple[List[ChoiceRequest], Dict[str, int]]:
+    """Generate a small random allocation instance with unit sizes."""
+    rng = random.Random(seed)
+    area_ids = [f"area-{i}" for i in range(rng.randint(1, max_areas))]
+    capacities = {a: rng.randint(0, 3) for a in area_ids}
+    # Choices may name areas without capacity, which still count towards a cabin's ranks.
+    listed = area_ids + ["area-closed"]
+    requests = [
+        ChoiceRequest(f"cabin-{i}", rng.sample(listed, rng.randint(0, len(listed))))
+        for i in range(rng.randint(0, max_requests))
+    ]
+    return requests, capacities
+
+def get_rank_signature(requests: List[ChoiceRequest], placement: Dict[str, str]) -> Tuple[int, ...]:
+    """Number of cabins placed at each rank, best rank first."""
+    signature = [0] * max((len(r.choices) for r in requests), default=0)
+    for request in requests:
+        if request.cabin_id in placement:
+            signature[request.choices.index(placement[request.cabin_id])] += 1
+    return tuple(signature)
+
+def brute_force_rank_maximal(requests: List[ChoiceRequest], capacities: Dict[str, int]) -> Tuple[int, ...]:
+    """Best rank signature over every allocation. Only usable on a handful of requests."""
+    options = [[None] + [a for a in dict.fromkeys(r.choices) if a in capacities] for r in requests]
+    best: Tuple[int, ...] = ()
+    for combination in itertools.product(*options):
+        load: Dict[str, int] = {}
+        for request, area_id in zip(requests, combination):
+            if area_id is not None:
+                load[area_id] = load.get(area_id, 0) + request.size
+        if any(load[a] > capacities[a] for a in load):
+            continue
+        placement = {r.cabin_id: a for r, a in zip(requests, combination) if a is not None}
+        best = max(best, get_rank_signature(requests, placement))
+    return best
+
+def check_rank_maximal(seeds: Iterable[int] = range(200), **generator_options) -> AllocationCheckReport:
+    """
+    Compare rank-maximal allocation against brute force on small generated instances,
+    recording the seeds on which it found a worse rank signature.
+    """
+    report = AllocationCheckReport()
+    for seed in seeds:
+        requests, capacities = generate_choice_instance(seed, **generator_options)
+        start = time.perf_counter()
+        placement = allocate_choices(requests, capacities, RANK_MAXIMAL, seed)
+        report.duration += time.perf_counter() - start
+        report.runs += 1
+        if get_rank_signature(requests, placement) != brute_force_rank_maximal(requests, capacities):
+            report.failures.append(seed)
+    return report
+
+def time_rank_maximal(num_requests: int, num_areas: int = 25, choices: int = 5, seed: Optional[int] = None) -> float:
+    """Time one rank-maximal allocation of randomly ranked requests against roughly matching capacity."""
+    rng = random.Random(num_requests if seed is None else seed)
+    area_ids = [f"area-{i}" for i in range(num_areas)]
+    requests = [ChoiceRequest(f"cabin-{i}", rng.sample(area_ids, min(choices, num_areas))) for i in range(num_requests)]
+    capacities = {a: max(1, int(num_requests / num_areas * rng.uniform(0.5, 1.5))) for a in area_ids}
+    start = time.perf_counter()
+    allocate_choices(requests, capacities, RANK_MAXIMAL, 0)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Check rank-maximal choice allocation against brute force.")
+    parser.add_argument("--seeds", type=int, default=200, help="Number of generated instances to check")
+    parser.add_argument("--requests", type=int, default=7, help="Maximum requests per instance")
+    parser.add_argument("--areas", type=int, default=4, help="Maximum areas per instance")
+    parser.add_argument("--time", type=int, default=0, help="Also time one allocation of this many requests")
+    args = parser.parse_args()
+
+    report = check_rank_maximal(range(args.seeds), max_requests=args.requests, max_areas=args.areas)
+    print(f"Checked {report.runs} allocations in {report.duration:.3f}s")
+    if report.passed:
+        print("No worse than brute force")
+    else:
+        print(f"Worse than brute force on seeds {report.failures}")
+    if args.time:
+        print(f"Allocated {args.time} requests in {time_rank_maximal(args.time):.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Tuple, Type
+
+from .models import Assignment, Cabin, Period, ActivityArea
+from .hard_constraints import check_hard_constraints, compile_constraint_plans
+from .soft_constraints import rank_candidate_areas
+from .utils import get_candidate_areas
+
+class SchedulerBackend(ABC):
+    """
+    Engine behind CampScheduler: state storage, candidate generation,
+    hard-constraint checking and soft-constraint ranking.
+    Every backend is expected to produce the same schedules as the reference backend.
+
+    The default state storage indexes committed assignments by period, which the
+    scheduler uses for its per-period lookups. Backends may override it along with
+    the record/forget hooks that keep it up to date.
+    """
+    name = ""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.periods: List[Period] = config.get("periods", [])
+        self.slot_counts: Dict[Tuple[int, str], int] = {}
+        self.cabin_slot_counts: Dict[Tuple[str, int, str], int] = {}
+        self.area_slot_counts: Dict[Tuple[str, int, str], int] = {}
+
+    def record(self, assignment: Assignment):
+        """Called after an assignment is committed."""
+        self._adjust_counts(assignment, 1)
+
+    def forget(self, assignments: List[Assignment]):
+        """Called when assignments leave the in-memory scheduling state."""
+        for assignment in assignments:
+            self._adjust_counts(assignment, -1)
+
+    def _adjust_counts(self, assignment: Assignment, change: int):
+        slot = (assignment.day, assignment.period_id)
+        for counts, key in (
+            (self.slot_counts, slot),
+            (self.cabin_slot_counts, (assignment.cabin_id,) + slot),
+            (self.area_slot_counts, (assignment.area_id,) + slot),
+        ):
+            counts[key] = counts.get(key, 0) + change
+            if counts[key] == 0:
+                del counts[key]
+
+    def count_period_assignments(self, day: int, period_id: str) -> int:
+        """Number of assignments committed for a period."""
+        return self.slot_counts.get((day, period_id), 0)
+
+    def is_cabin_assigned(self, cabin_id: str, day: int, period_id: str) -> bool:
+        """Check if a cabin already has an assignment for a period."""
+        return (cabin_id, day, period_id) in self.cabin_slot_counts
+
+    def get_area_utilization(self, area_id: str, day: int, period_id: str) -> int:
+        """Number of cabins assigned to an area for a period."""
+        return self.area_slot_counts.get((area_id, day, period_id), 0)
+
+    @abstractmethod
+    def candidate_areas(self, cabin: Cabin, period: Period) -> List[ActivityArea]:
+        """Get the areas worth checking for a cabin during a period."""
+
+    @abstractmethod
+    def check(self, cabin: Cabin, area: ActivityArea, period: Period, assignments: List[Assignment]) -> Tuple[bool, str]:
+        """Check the hard constraints, returning (isValid, reason)."""
+
+    @abstractmethod
+    def rank(self, areas: List[ActivityArea], cabin: Cabin, period: Period, assignments: List[Assignment]) -> List[ActivityArea]:
+        """Rank valid areas from best to worst."""
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Backend-specific statistics to include in the scheduling statistics."""
+        return {}
+
+class ReferenceBackend(SchedulerBackend):
+    """The reference scheduling logic from hard_constraints.py and soft_constraints.py."""
+    name = "reference"
+
+    def candidate_areas(self, cabin: Cabin, period: Period) -> List[ActivityArea]:
+        return get_candidate_areas(cabin, self.config.get("areas", []), self.periods, period.day, period.id)
+
+    def check(self, cabin: Cabin, area: ActivityArea, period: Period, assignments: List[Assignment]) -> Tuple[bool, str]:
+        return check_hard_constraints(cabin, area, period, assignments, self.config, self.periods)
+
+    def rank(self, areas: List[ActivityArea], cabin: Cabin, period: Period, assignments: List[Assignment]) -> List[ActivityArea]:
+        return rank_candidate_areas(areas, cabin, period, assignments, self.config, self.periods)
+
+class PlannedBackend(ReferenceBackend):
+    """Reference logic with hard constraints evaluated through compiled per-area plans."""
+    name = "planned"
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.constraint_plans = compile_constraint_plans(config)
+
+    def check(self, cabin: Cabin, area: ActivityArea, period: Period, assignments: List[Assignment]) -> Tuple[bool, str]:
+        return check_hard_constraints(
+            cabin, area, period, assignments, self.config, self.periods,
+            plan=self.constraint_plans.get(area.id),
+        )
+
+    def get_statistics(self) -> Dict[str, Any]:
+        rejections: Dict[str, int] = {}
+        for plan in self.constraint_plans.values():
+            for name, count in plan.rejections.items():
+                rejections[name] = rejections.get(name, 0) + count
+        return {"constraint_rejections": rejections}
+
+BACKENDS: Dict[str, Type[SchedulerBackend]] = {}
+
+DEFAULT_BACKEND = "planned"
+
+def register_backend(backend_class: Type[SchedulerBackend]) -> Type[SchedulerBackend]:
+    """Register a backend class under its name."""
+    BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+def create_backend(name: str, config: Dict[str, Any]) -> SchedulerBackend:
+    """Create a registered backend for a config."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown scheduler backend: {name}")
+    return BACKENDS[name](config)
+
+register_backend(ReferenceBackend)
+register_backend(PlannedBackend)
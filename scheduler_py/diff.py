@@ -0,0 +1,96 @@
+import json
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterable, Tuple, Union
+
+from .models import Assignment
+
+SlotKey = Tuple[str, int, str]
+
+@dataclass
+class SchedulePatch:
+    """Compact difference between two schedules, keyed by (cabin, day, period)."""
+    added: List[Assignment] = field(default_factory=list)
+    removed: List[Assignment] = field(default_factory=list)
+    moved: List[Assignment] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.moved)
+
+    def get_churn(self) -> Dict[str, int]:
+        """Count added, removed and moved assignments."""
+        return {"added": len(self.added), "removed": len(self.removed), "moved": len(self.moved)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Removals only need the key to be applied.
+        return {
+            "added": [a.__dict__ for a in self.added],
+            "removed": [{"cabin_id": a.cabin_id, "day": a.day, "period_id": a.period_id} for a in self.removed],
+            "moved": [a.__dict__ for a in self.moved],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SchedulePatch":
+        return cls(
+            added=[Assignment(**a) for a in data.get("added", [])],
+            removed=[Assignment(area_id="", **a) for a in data.get("removed", [])],
+            moved=[Assignment(**a) for a in data.get("moved", [])],
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "SchedulePatch":
+        return cls.from_dict(json.loads(text))
+
+def get_slot_key(assignment: Assignment) -> SlotKey:
+    """Key identifying the cabin's slot for an assignment."""
+    return (assignment.cabin_id, assignment.day, assignment.period_id)
+
+def index_assignments(assignments: Iterable[Union[Assignment, Dict[str, Any]]]) -> Dict[SlotKey, List[Assignment]]:
+    """
+    Index assignments (or their exported dicts) by (cabin, day, period). A slot can hold
+    more than one assignment, e.g. a manual override and a choice period entry, so every
+    slot maps to the list of its assignments in their original order.
+    """
+    index: Dict[SlotKey, List[Assignment]] = {}
+    for a in assignments:
+        if isinstance(a, dict):
+            a = Assignment(**a)
+        index.setdefault(get_slot_key(a), []).append(a)
+    return index
+
+def diff_schedules(
+    old: Iterable[Union[Assignment, Dict[str, Any]]],
+    new: Iterable[Union[Assignment, Dict[str, Any]]]
+) -> SchedulePatch:
+    """
+    Compute the patch turning `old` into `new` in linear time.
+    A slot's assignments are moved when the slot exists in both schedules with a
+    different area, flags or number of assignments, and added or removed when the
+    slot exists in only one of them. A moved slot is replaced as a whole.
+    """
+    old_index = index_assignments(old)
+    new_index = index_assignments(new)
+    patch = SchedulePatch()
+    for key, assignments in new_index.items():
+        previous = old_index.get(key)
+        if previous is None:
+            patch.added.extend(assignments)
+        elif previous != assignments:
+            patch.moved.extend(assignments)
+    for key, assignments in old_index.items():
+        if key not in new_index:
+            patch.removed.extend(assignments)
+    return patch
+
+def apply_patch(assignments: Iterable[Union[Assignment, Dict[str, Any]]], patch: SchedulePatch) -> List[Assignment]:
+    """Apply a patch to a stored schedule, keeping the order of untouched assignments."""
+    index = index_assignments(assignments)
+    for a in patch.removed:
+        index.pop(get_slot_key(a), None)
+    for key, moved in index_assignments(patch.moved).items():
+        index[key] = moved
+    for a in patch.added:
+        index.setdefault(get_slot_key(a), []).append(a)
+    return [a for slot in index.values() for a in slot]
@@ -0,0 +1,217 @@
+import argparse
+import contextlib
+import copy
+import io
+import random
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from .models import (
+    Period, ActivityArea, Cabin, Assignment, Preferences, Restrictions,
+    DoubleBooking, DoubleBookingLikelihood, DoubleBookingScope, Accessibility
+)
+from .scheduler import CampScheduler
+
+AGE_GROUPS = ["Juniors", "Intermediates", "Seniors"]
+CATEGORIES = ["Aquatics", "Sports", "Arts", "Adventure", "Nature"]
+
+@dataclass
+class Divergence:
+    """The first assignment on which two backends disagree."""
+    seed: int
+    index: int
+    expected: Optional[Assignment]
+    actual: Optional[Assignment]
+
+@dataclass
+class DifferentialReport:
+    """Result of running generated configs through two backends."""
+    backend_a: str
+    backend_b: str
+    runs: int = 0
+    divergence: Optional[Divergence] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def equivalent(self) -> bool:
+        return self.divergence is None
+
+def generate_config(seed: int, days: int = 3, periods_per_day: int = 4, num_cabins: int = 8, num_areas: int = 8) -> Dict[str, Any]:
+    """Generate a random but reproducible scheduler configuration."""
+    rng = random.Random(seed)
+
+    periods = []
+    for day in range(1, days + 1):
+        for i in range(periods_per_day):
+            periods.append(Period(
+                id=f"p{i + 1}", name=f"Period {i + 1}", start_time=900 + 100 * i, end_time=1000 + 100 * i,
+                day=day, is_choice_period=rng.random() < 0.1,
+                blackout_areas=[f"area-{rng.randrange(num_areas)}"] if rng.random() < 0.2 else [],
+            ))
+
+    areas = []
+    for i in range(num_areas):
+        areas.append(ActivityArea(
+            id=f"area-{i}", name=f"Area {i}", max_capacity=rng.randint(1, 4),
+            category=rng.choice(CATEGORIES), weather_sensitive=rng.random() < 0.5,
+            buffer_periods=1 if rng.random() < 0.15 else 0,
+            accessibility=Accessibility(forbidden=[rng.choice(AGE_GROUPS)] if rng.random() < 0.2 else []),
+            double_booking=DoubleBooking(
+                rng.choice(list(DoubleBookingLikelihood)), DoubleBookingScope.ANY_UNIT
+            ),
+            alternates_days=rng.random() < 0.2, alternate_day_offset=rng.randint(0, 1),
+            travel_time=rng.randint(0, 40),
+        ))
+    for _ in range(num_areas // 4):
+        a, b = rng.sample(areas, 2)
+        a.linked_areas.append(b.id)
+        b.linked_areas.append(a.id)
+
+    area_ids = [a.id for a in areas]
+    period_ids = [f"p{i + 1}" for i in range(periods_per_day)]
+    cabins = []
+    for i in range(num_cabins):
+        cabins.append(Cabin(
+            id=f"cabin-{i}", name=f"Cabin {i}", age_group=rng.choice(AGE_GROUPS), unit=f"U{i % 3}",
+            size=rng.randint(6, 16), priority=rng.randint(0, 2),
+            social_groups=[f"cabin-{rng.randrange(num_cabins)}"] if rng.random() < 0.3 else [],
+            preferences=Preferences(
+                favorite_areas=rng.sample(area_ids, rng.randint(0, 2)),
+                avoid_areas=rng.sample(area_ids, rng.randint(0, 1)),
+            ),
+            restrictions=Restrictions(
+                blackout_periods=rng.sample(period_ids, 1) if rng.random() < 0.2 else [],
+                blackout_areas=rng.sample(area_ids, 1) if rng.random() < 0.2 else [],
+            ),
+        ))
+
+    def random_slot_entry() -> Dict[str, Any]:
+        period = rng.choice(periods)
+        return {"cabinId": rng.choice(cabins).id, "areaId": rng.choice(area_ids), "periodId": period.id, "day": period.day}
+
+    config = {
+        "cabins": cabins,
+        "areas": areas,
+        "periods": periods,
+        "manualOverrides": [random_slot_entry() for _ in range(rng.randint(0, 3))],
+        "choicePeriods": [random_slot_entry() for _ in range(rng.randint(0, 3))],
+        "blackoutPeriods": [{k: v for k, v in random_slot_entry().items() if k != "areaId"} for _ in range(rng.randint(0, 3))],
+        "allowedTransitionTime": rng.randint(15, 40),
+        "noRepeatsDays": rng.randint(0, 3),
+        "ageGroupPriorities": [
+            {"ageGroup": rng.choice(AGE_GROUPS), "areaId": rng.choice(area_ids), "priority": rng.randint(1, 5)}
+            for _ in range(rng.randint(0, 3))
+        ],
+        "areaUtilizationGoals": [
+            {"areaId": rng.choice(area_ids), "targetUtilization": rng.randint(1, 3)}
+            for _ in range(rng.randint(0, 2))
+        ],
+    }
+    if rng.random() < 0.5:
+        config["travelGraph"] = [
+            {"from": a, "to": b, "minutes": rng.randint(2, 20)}
+            for a, b in (rng.sample(area_ids, 2) for _ in range(num_areas * 2))
+        ]
+    return config
+
+def run_backend(config: Dict[str, Any], backend: str, seed: int, rolling_horizon: bool = False) -> Tuple[List[Assignment], float]:
+    """Schedule a copy of the config with the given backend and random seed, returning assignments and duration."""
+    config = copy.deepcopy(config)
+    config["backend"] = backend
+    if rolling_horizon:
+        config["rollingHorizon"] = True
+    random_state = random.getstate()
+    random.seed(seed)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), CampScheduler(config) as scheduler:
+            start = time.perf_counter()
+            result = scheduler.schedule()
+            duration = time.perf_counter() - start
+    finally:
+        random.setstate(random_state)
+    if not result["success"]:
+        raise RuntimeError(f"Backend {backend} failed on seed {seed}: {result['error']}")
+    return result["assignments"], duration
+
+def compare_backends(backend_a: str = "reference", backend_b: str = "planned", seeds: Iterable[int] = range(20), **generator_options) -> DifferentialReport:
+    """
+    Run generated configs through two backends with fixed seeds, stopping at the
+    first diverging assignment.
+    """
+    report = DifferentialReport(backend_a, backend_b, timings={backend_a: 0.0, backend_b: 0.0})
+    for seed in seeds:
+        config = generate_config(seed, **generator_options)
+        expected, duration_a = run_backend(config, backend_a, seed)
+        actual, duration_b = run_backend(config, backend_b, seed)
+        report.timings[backend_a] += duration_a
+        report.timings[backend_b] += duration_b
+        report.runs += 1
+
+        report.divergence = find_divergence(seed, expected, actual)
+        if report.divergence is not None:
+            return report
+    return report
+
+def compare_rolling_horizon(backend: str = "planned", seeds: Iterable[int] = range(20), **generator_options) -> DifferentialReport:
+    """
+    Run generated configs with and without rolling-horizon mode, stopping at the first
+    diverging assignment. Rolling-horizon mode emits assignments in chronological order,
+    so it is compared against the default schedule sorted by day and period start time.
+    """
+    full, rolling = f"{backend}", f"{backend} (rolling horizon)"
+    report = DifferentialReport(full, rolling, timings={full: 0.0, rolling: 0.0})
+    for seed in seeds:
+        config = generate_config(seed, **generator_options)
+        start_times = {(p.day, p.id): p.start_time for p in config["periods"]}
+
+        expected, duration_a = run_backend(config, backend, seed)
+        actual, duration_b = run_backend(config, backend, seed, rolling_horizon=True)
+        report.timings[full] += duration_a
+        report.timings[rolling] += duration_b
+        report.runs += 1
+
+        expected = sorted(expected, key=lambda a: (a.day, start_times.get((a.day, a.period_id), 0)))
+        report.divergence = find_divergence(seed, expected, actual)
+        if report.divergence is not None:
+            return report
+    return report
+
+def find_divergence(seed: int, expected: List[Assignment], actual: List[Assignment]) -> Optional[Divergence]:
+    """Find the first position at which two assignment lists differ."""
+    for index in range(max(len(expected), len(actual))):
+        a = expected[index] if index < len(expected) else None
+        b = actual[index] if index < len(actual) else None
+        if a != b:
+            return Divergence(seed, index, a, b)
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that two scheduler backends produce identical schedules.")
+    parser.add_argument("--a", default="reference", help="Backend to treat as the expected result")
+    parser.add_argument("--b", default="planned", help="Backend under test")
+    parser.add_argument("--seeds", type=int, default=20, help="Number of generated configs to compare")
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--cabins", type=int, default=8)
+    parser.add_argument("--areas", type=int, default=8)
+    parser.add_argument("--rolling", action="store_true", help="Compare backend --b with and without rolling-horizon mode")
+    args = parser.parse_args()
+
+    generator_options = {"days": args.days, "num_cabins": args.cabins, "num_areas": args.areas}
+    if args.rolling:
+        report = compare_rolling_horizon(args.b, range(args.seeds), **generator_options)
+    else:
+        report = compare_backends(args.a, args.b, range(args.seeds), **generator_options)
+    print(f"Compared {report.runs} configs: {report.backend_a} vs {report.backend_b}")
+    for backend, duration in report.timings.items():
+        print(f"  {backend}: {duration:.3f}s")
+    if report.equivalent:
+        print("No divergence found")
+    else:
+        d = report.divergence
+        print(f"Divergence on seed {d.seed} at assignment {d.index}:")
+        print(f"  {report.backend_a}: {d.expected}")
+        print(f"  {report.backend_b}: {d.actual}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from .models import Assignment
+from .utils import get_travel_matrix
+
+# Objective weights, mirroring the soft constraint scores.
+FAVORITE_SCORE = 30
+AVOID_SCORE = -50
+AGE_GROUP_PRIORITY_WEIGHT = 10
+SAME_CATEGORY_SCORE = -20
+TRAVEL_OK_SCORE = 10
+TRAVEL_EXCEEDED_SCORE = -15
+SOCIAL_GROUP_SCORE = 25
+UTILIZATION_GOAL_SCORE = 20
+OVER_CAPACITY_SCORE = -30
+
+@dataclass
+class ScheduleEvaluation:
+    """Objective and fairness metrics for a complete schedule."""
+    total: float
+    components: Dict[str, float]
+    per_cabin: Dict[str, Dict[str, float]]
+    fairness: Dict[str, float]
+    ignored_assignments: int = 0
+
+class ScheduleEvaluator:
+    """
+    Scores complete assignment sets over NumPy arrays.
+
+    The objective is the whole-schedule analogue of the soft constraints:
+    - preference: favorite/avoid areas and age group priorities
+    - transitions: travel time and same-category penalties between consecutive periods of a day
+    - social: social group partners placed in the same area and period
+    - utilization: utilization goal attainment and over-capacity penalties per area and period
+
+    After `load`, `delta` scores a single proposed change in O(1) (bounded by the
+    number of social group partners of the cabin) and `apply` commits it.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.areas = list(config.get("areas", []))
+        self.cabins = list(config.get("cabins", []))
+        self.area_index = {a.id: i for i, a in enumerate(self.areas)}
+        self.cabin_index = {c.id: i for i, c in enumerate(self.cabins)}
+
+        periods = sorted(config.get("periods", []), key=lambda p: (p.day, p.start_time))
+        self.slots: List[Tuple[int, str]] = []
+        self.slot_index: Dict[Tuple[int, str], int] = {}
+        for p in periods:
+            key = (p.day, p.id)
+            if key not in self.slot_index:
+                self.slot_index[key] = len(self.slots)
+                self.slots.append(key)
+
+        n_slots = len(self.slots)
+        slot_days = np.array([day for day, _ in self.slots], dtype=np.int64)
+        self.next_slot = np.full(n_slots, -1, dtype=np.int64)
+        self.prev_slot = np.full(n_slots, -1, dtype=np.int64)
+        if n_slots > 1:
+            same_day = np.nonzero(slot_days[:-1] == slot_days[1:])[0]
+            self.next_slot[same_day] = same_day + 1
+            self.prev_slot[same_day + 1] = same_day
+        self.transition_from = np.nonzero(self.next_slot >= 0)[0]
+        self.transition_to = self.next_slot[self.transition_from]
+
+        self._build_area_tables()
+        self._build_cabin_tables()
+        self.grid: Optional[np.ndarray] = None
+        self.occupancy: Optional[np.ndarray] = None
+
+    def _build_area_tables(self):
+        n_areas = len(self.areas)
+        categories = sorted({a.category for a in self.areas})
+        category_index = {c: i for i, c in enumerate(categories)}
+        self.n_categories = len(categories)
+        self.area_category = np.array([category_index[a.category] for a in self.areas], dtype=np.int64)
+
+        self.travel = get_travel_matrix(self.config).minutes
+        self.allowed_transition_time = self.config.get("allowedTransitionTime", 30)
+        self.travel_exceeded = self.travel > self.allowed_transition_time
+
+        same_category = self.area_category[:, None] == self.area_category[None, :]
+        self.transition_score = (
+            np.where(self.travel_exceeded, TRAVEL_EXCEEDED_SCORE, TRAVEL_OK_SCORE)
+            + SAME_CATEGORY_SCORE * same_category
+        ).astype(np.float64)
+
+        self.capacity = np.array([a.max_capacity for a in self.areas], dtype=np.float64)
+        self.goal_target = np.full(n_areas, np.nan)
+        for goal in self.config.get("areaUtilizationGoals", []):
+            i = self.area_index.get(goal.get("areaId"))
+            if i is not None:
+                target = goal.get("targetUtilization", self.areas[i].max_capacity * 0.8)
+                self.goal_target[i] = np.ceil(target)
+        self.has_goal = ~np.isnan(self.goal_target)
+
+    def _build_cabin_tables(self):
+        n_cabins, n_areas = len(self.cabins), len(self.areas)
+        self.preference = np.zeros((n_cabins, n_areas), dtype=np.float64)
+        self.favorite = np.zeros((n_cabins, n_areas), dtype=bool)
+        for c, cabin in enumerate(self.cabins):
+            for area_id in cabin.preferences.favorite_areas:
+                if area_id in self.area_index:
+                    self.favorite[c, self.area_index[area_id]] = True
+                    self.preference[c, self.area_index[area_id]] += FAVORITE_SCORE
+            for area_id in cabin.preferences.avoid_areas:
+                if area_id in self.area_index:
+                    self.preference[c, self.area_index[area_id]] += AVOID_SCORE
+            for priority in self.config.get("ageGroupPriorities", []):
+                a = self.area_index.get(priority.get("areaId"))
+                if priority.get("ageGroup") == cabin.age_group and a is not None:
+                    self.preference[c, a] += priority.get("priority", 0) * AGE_GROUP_PRIORITY_WEIGHT
+
+        # A cabin listing itself is never scored against itself, matching the soft constraint.
+        pairs = [
+            (c, self.cabin_index[partner])
+            for c, cabin in enumerate(self.cabins)
+            for partner in cabin.social_groups
+            if partner in self.cabin_index and partner != cabin.id
+        ]
+        self.social_src = np.array([s for s, _ in pairs], dtype=np.int64)
+        self.social_dst = np.array([d for _, d in pairs], dtype=np.int64)
+        self.partners_out: List[List[int]] = [[] for _ in self.cabins]
+        self.partners_in: List[List[int]] = [[] for _ in self.cabins]
+        for src, dst in pairs:
+            self.partners_out[src].append(dst)
+            self.partners_in[dst].append(src)
+
+    def build_grid(self, assignments: List[Assignment]) -> Tuple[np.ndarray, int]:
+        """Build the cabin x slot area-index grid (-1 when unassigned)."""
+        grid = np.full((len(self.cabins), len(self.slots)), -1, dtype=np.int64)
+        ignored = 0
+        for a in assignments:
+            c = self.cabin_index.get(a.cabin_id)
+            s = self.slot_index.get((a.day, a.period_id))
+            area = self.area_index.get(a.area_id)
+            if c is None or s is None or area is None:
+                ignored += 1
+                continue
+            grid[c, s] = area
+        return grid, ignored
+
+    def _occupancy(self, grid: np.ndarray) -> np.ndarray:
+        n_areas, n_slots = len(self.areas), len(self.slots)
+        filled = grid >= 0
+        flat = grid[filled] * n_slots + np.nonzero(filled)[1]
+        return np.bincount(flat, minlength=n_areas * n_slots).reshape(n_areas, n_slots).astype(np.float64)
+
+    def _utilization_score(self, area: int, occupancy: float) -> float:
+        if not self.has_goal[area]:
+            return 0.0
+        return (
+            UTILIZATION_GOAL_SCORE * min(occupancy, self.goal_target[area])
+            + OVER_CAPACITY_SCORE * max(occupancy - self.capacity[area], 0)
+        )
+
+    def evaluate(self, assignments: List[Assignment]) -> ScheduleEvaluation:
+        """Score a complete assignment set without touching the loaded state."""
+        grid, ignored = self.build_grid(assignments)
+        return self._evaluate_grid(grid, ignored)
+
+    def load(self, assignments: List[Assignment]) -> ScheduleEvaluation:
+        """Load an assignment set as the base state for delta evaluation and score it."""
+        self.grid, ignored = self.build_grid(assignments)
+        self.occupancy = self._occupancy(self.grid)
+        return self._evaluate_grid(self.grid, ignored)
+
+    def _evaluate_grid(self, grid: np.ndarray, ignored: int) -> ScheduleEvaluation:
+        n_cabins = len(self.cabins)
+        if not self.areas or not self.slots:
+            return self._empty_evaluation(ignored)
+        filled = grid >= 0
+        safe = np.where(filled, grid, 0)
+        rows = np.arange(n_cabins)[:, None]
+
+        preference = (self.preference[rows, safe] * filled).sum(axis=1)
+        favorite_hits = (self.favorite[rows, safe] & filled).sum(axis=1)
+
+        first = safe[:, self.transition_from]
+        second = safe[:, self.transition_to]
+        both = filled[:, self.transition_from] & filled[:, self.transition_to]
+        transitions = (self.transition_score[first, second] * both).sum(axis=1)
+        travel_violations = (self.travel_exceeded[first, second] & both).sum(axis=1)
+
+        if len(self.social_src):
+            together = (grid[self.social_src] == grid[self.social_dst]) & filled[self.social_src]
+            social = np.bincount(
+                self.social_src, weights=together.sum(axis=1) * SOCIAL_GROUP_SCORE, minlength=n_cabins
+            )
+        else:
+            social = np.zeros(n_cabins)
+
+        occupancy = self._occupancy(grid)
+        target = np.where(self.has_goal, self.goal_target, 0)[:, None]
+        utilization_scores = (
+            UTILIZATION_GOAL_SCORE * np.minimum(occupancy, target)
+            + OVER_CAPACITY_SCORE * np.maximum(occupancy - self.capacity[:, None], 0)
+        ) * self.has_goal[:, None]
+        utilization = float(utilization_scores.sum())
+
+        categories_visited = np.zeros((n_cabins, max(self.n_categories, 1)), dtype=bool)
+        cabin_rows = np.broadcast_to(rows, grid.shape)[filled]
+        categories_visited[cabin_rows, self.area_category[grid[filled]]] = True
+        category_coverage = categories_visited.sum(axis=1) / max(self.n_categories, 1)
+
+        if self.has_goal.any() and len(self.slots):
+            goal_occupancy = occupancy[self.has_goal]
+            goal_target = self.goal_target[self.has_goal][:, None]
+            attainment = float(np.minimum(goal_occupancy / np.maximum(goal_target, 1), 1).mean())
+        else:
+            attainment = 1.0
+
+        cabin_totals = preference + transitions + social
+        components = {
+            "preference": float(preference.sum()),
+            "transitions": float(transitions.sum()),
+            "social": float(social.sum()),
+            "utilization": utilization,
+        }
+        per_cabin = {
+            cabin.id: {
+                "total": float(cabin_totals[c]),
+                "preference": float(preference[c]),
+                "transitions": float(transitions[c]),
+                "social": float(social[c]),
+                "assignments": int(filled[c].sum()),
+                "favorite_hits": int(favorite_hits[c]),
+                "category_coverage": float(category_coverage[c]),
+                "travel_violations": int(travel_violations[c]),
+            }
+            for c, cabin in enumerate(self.cabins)
+        }
+        if n_cabins:
+            fairness = {
+                "favorite_hits_min": float(favorite_hits.min()),
+                "favorite_hits_max": float(favorite_hits.max()),
+                "favorite_hits_std": float(favorite_hits.std()),
+                "category_coverage_mean": float(category_coverage.mean()),
+                "category_coverage_min": float(category_coverage.min()),
+                "travel_violations": int(travel_violations.sum()),
+                "utilization_goal_attainment": attainment,
+            }
+        else:
+            fairness = {"travel_violations": 0, "utilization_goal_attainment": attainment}
+
+        return ScheduleEvaluation(
+            total=float(cabin_totals.sum()) + utilization,
+            components=components,
+            per_cabin=per_cabin,
+            fairness=fairness,
+            ignored_assignments=ignored,
+        )
+
+    def _empty_evaluation(self, ignored: int) -> ScheduleEvaluation:
+        # Without areas or periods nothing can be assigned, so every score is zero.
+        per_cabin = {
+            cabin.id: {
+                "total": 0.0, "preference": 0.0, "transitions": 0.0, "social": 0.0, "assignments": 0,
+                "favorite_hits": 0, "category_coverage": 0.0, "travel_violations": 0,
+            }
+            for cabin in self.cabins
+        }
+        fairness = {"travel_violations": 0, "utilization_goal_attainment": 1.0}
+        if self.cabins:
+            fairness = {
+                "favorite_hits_min": 0.0, "favorite_hits_max": 0.0, "favorite_hits_std": 0.0,
+                "category_coverage_mean": 0.0, "category_coverage_min": 0.0, **fairness,
+            }
+        return ScheduleEvaluation(
+            total=0.0,
+            components={"preference": 0.0, "transitions": 0.0, "social": 0.0, "utilization": 0.0},
+            per_cabin=per_cabin,
+            fairness=fairness,
+            ignored_assignments=ignored,
+        )
+
+    def _resolve_change(self, cabin_id: str, day: int, period_id: str, area_id: Optional[str]) -> Tuple[int, int, int]:
+        if self.grid is None:
+            raise ValueError("No schedule loaded; call load() first")
+        c = self.cabin_index[cabin_id]
+        s = self.slot_index[(day, period_id)]
+        new_area = -1 if area_id is None else self.area_index[area_id]
+        return c, s, new_area
+
+    def delta(self, cabin_id: str, day: int, period_id: str, area_id: Optional[str]) -> float:
+        """
+        Objective change if the cabin were moved to `area_id` for the given period
+        (None removes the assignment), relative to the loaded state.
+        """
+        c, s, new_area = self._resolve_change(cabin_id, day, period_id, area_id)
+        old_area = int(self.grid[c, s])
+        if old_area == new_area:
+            return 0.0
+
+        change = 0.0
+        if old_area >= 0:
+            change -= self.preference[c, old_area]
+        if new_area >= 0:
+            change += self.preference[c, new_area]
+
+        prev_slot, next_slot = self.prev_slot[s], self.next_slot[s]
+        if prev_slot >= 0 and self.grid[c, prev_slot] >= 0:
+            neighbour = self.grid[c, prev_slot]
+            if old_area >= 0:
+                change -= self.transition_score[neighbour, old_area]
+            if new_area >= 0:
+                change += self.transition_score[neighbour, new_area]
+        if next_slot >= 0 and self.grid[c, next_slot] >= 0:
+            neighbour = self.grid[c, next_slot]
+            if old_area >= 0:
+                change -= self.transition_score[old_area, neighbour]
+            if new_area >= 0:
+                change += self.transition_score[new_area, neighbour]
+
+        for partner in self.partners_out[c] + self.partners_in[c]:
+            partner_area = self.grid[partner, s]
+            if partner_area < 0:
+                continue
+            if partner_area == old_area:
+                change -= SOCIAL_GROUP_SCORE
+            if partner_area == new_area:
+                change += SOCIAL_GROUP_SCORE
+
+        if old_area >= 0:
+            occupancy = self.occupancy[old_area, s]
+            change += self._utilization_score(old_area, occupancy - 1) - self._utilization_score(old_area, occupancy)
+        if new_area >= 0:
+            occupancy = self.occupancy[new_area, s]
+            change += self._utilization_score(new_area, occupancy + 1) - self._utilization_score(new_area, occupancy)
+
+        return float(change)
+
+    def apply(self, cabin_id: str, day: int, period_id: str, area_id: Optional[str]) -> float:
+        """Commit a single change to the loaded state and return its objective delta."""
+        change = self.delta(cabin_id, day, period_id, area_id)
+        c, s, new_area = self._resolve_change(cabin_id, day, period_id, area_id)
+        old_area = self.grid[c, s]
+        if old_area >= 0:
+            self.occupancy[old_area, s] -= 1
+        if new_area >= 0:
+            self.occupancy[new_area, s] += 1
+        self.grid[c, s] = new_area
+        return change
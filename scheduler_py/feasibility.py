@@ -0,0 +1,352 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from .models import Cabin, Period, ActivityArea
+from .utils import get_candidate_areas, is_area_available
+
+# Linked-area groups up to this size get an exact exclusivity bound; larger ones
+# fall back to the plain sum of capacities.
+MAX_EXACT_LINKED_GROUP = 16
+
+class InfeasibleScheduleError(ValueError):
+    """Raised when the pre-solve analysis proves a configuration cannot be fully scheduled."""
+
+@dataclass
+class FeasibilityIssue:
+    """A single problem found by the pre-solve analysis."""
+    severity: str
+    code: str
+    message: str
+    day: Optional[int] = None
+    period_id: Optional[str] = None
+    cabin_id: Optional[str] = None
+    area_id: Optional[str] = None
+
+@dataclass
+class SlotCapacity:
+    """Demand and capacity bounds for one period."""
+    day: int
+    period_id: str
+    demand: int
+    capacity: int
+    exclusive_capacity: int
+    assignable: int
+
+@dataclass
+class FeasibilityReport:
+    """Structured result of the pre-solve analysis."""
+    issues: List[FeasibilityIssue] = field(default_factory=list)
+    slots: List[SlotCapacity] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def errors(self) -> List[FeasibilityIssue]:
+        return [i for i in self.issues if i.severity == "error"]
+
+    @property
+    def warnings(self) -> List[FeasibilityIssue]:
+        return [i for i in self.issues if i.severity == "warning"]
+
+    @property
+    def feasible(self) -> bool:
+        return not self.errors
+
+    def summary(self) -> str:
+        return f"Feasibility analysis found {len(self.errors)} errors and {len(self.warnings)} warnings"
+
+def analyze_feasibility(config: Dict[str, Any]) -> FeasibilityReport:
+    """
+    Check a configuration for problems that make a complete schedule impossible,
+    without running the scheduler. Capacity results are upper bounds: a slot that
+    fails them cannot be fully assigned, but one that passes may still fail on
+    history-dependent rules (no repeats, travel time, buffer periods).
+    """
+    start = time.time()
+    report = FeasibilityReport()
+    areas: List[ActivityArea] = config.get("areas", [])
+    cabins: List[Cabin] = config.get("cabins", [])
+    periods: List[Period] = config.get("periods", [])
+
+    check_linked_areas(areas, report)
+    preplaced = check_preplaced_assignments(config, report)
+
+    seen_slots = set()
+    for period in sorted(periods, key=lambda p: (p.day, p.start_time)):
+        slot = (period.day, period.id)
+        if slot in seen_slots:
+            continue
+        seen_slots.add(slot)
+        analyze_slot(period, cabins, areas, config, preplaced.get(slot, []), report)
+
+    report.duration = time.time() - start
+    return report
+
+def _is_blacked_out(cabin: Cabin, day: int, period_id: str, config: Dict[str, Any]) -> bool:
+    if period_id in cabin.restrictions.blackout_periods:
+        return True
+    return any(
+        b["cabinId"] == cabin.id and b["periodId"] == period_id and b["day"] == day
+        for b in config.get("blackoutPeriods", [])
+    )
+
+def is_mutually_linked(area: ActivityArea, other_id: str, area_by_id: Dict[str, ActivityArea]) -> bool:
+    """
+    Check if two areas exclude each other. The hard rule only checks the links of the
+    area being assigned, so a one-way link still lets both areas be used in a period.
+    """
+    other = area_by_id.get(other_id)
+    return other is not None and other_id in area.linked_areas and area.id in other.linked_areas
+
+def check_linked_areas(areas: List[ActivityArea], report: FeasibilityReport):
+    """Warn about one-way area links, which are left out of the exclusivity bounds."""
+    area_by_id = {a.id: a for a in areas}
+    for area in areas:
+        for linked_id in area.linked_areas:
+            if linked_id in area_by_id and not is_mutually_linked(area, linked_id, area_by_id):
+                report.issues.append(FeasibilityIssue(
+                    "warning", "one_way_link",
+                    f"Area {area.name} is linked to {linked_id}, but not the other way round; "
+                    "both can be used in the same period depending on assignment order",
+                    area_id=area.id,
+                ))
+
+def check_preplaced_assignments(config: Dict[str, Any], report: FeasibilityReport) -> Dict[Tuple[int, str], List[Dict[str, Any]]]:
+    """Check manual overrides and choice periods against hard rules; return them grouped by slot."""
+    area_by_id = {a.id: a for a in config.get("areas", [])}
+    cabin_by_id = {c.id: c for c in config.get("cabins", [])}
+    periods = config.get("periods", [])
+    period_by_slot = {(p.day, p.id): p for p in periods}
+
+    preplaced: Dict[Tuple[int, str], List[Dict[str, Any]]] = {}
+    entries = [("manual override", e) for e in config.get("manualOverrides", [])]
+    entries += [("choice period", e) for e in config.get("choicePeriods", [])]
+    for kind, entry in entries:
+        day, period_id = entry["day"], entry["periodId"]
+        cabin, area = cabin_by_id.get(entry["cabinId"]), area_by_id.get(entry["areaId"])
+        period = period_by_slot.get((day, period_id))
+        location = {"day": day, "period_id": period_id, "cabin_id": entry["cabinId"], "area_id": entry["areaId"]}
+
+        def add(severity: str, code: str, message: str):
+            report.issues.append(FeasibilityIssue(severity, code, f"{kind.capitalize()} {message}", **location))
+
+        if period is None:
+            add("error", "unknown_period", f"references unknown period {period_id} on day {day}")
+            continue
+        if cabin is None or area is None:
+            add("error", "unknown_reference", f"references unknown cabin {entry['cabinId']} or area {entry['areaId']}")
+            continue
+        preplaced.setdefault((day, period_id), []).append(entry)
+
+        if kind == "choice period" and not period.is_choice_period:
+            add("warning", "not_choice_period", f"for {cabin.name} is in {period.name}, which is not a choice period")
+        if not is_area_available(area, periods, day, period_id):
+            add("error", "area_closed", f"puts {cabin.name} in {area.name}, which is closed during {period.name}")
+        if area.id in cabin.restrictions.blackout_areas:
+            add("error", "cabin_blackout_area", f"puts {cabin.name} in {area.name}, which it is blacked out from")
+        if _is_blacked_out(cabin, day, period_id, config):
+            add("error", "cabin_blackout_period", f"schedules {cabin.name} during blacked out {period.name}")
+        if (area.accessibility.forbidden and cabin.age_group in area.accessibility.forbidden) or (
+            area.accessibility.allowed and cabin.age_group not in area.accessibility.allowed
+        ):
+            add("error", "accessibility", f"puts {cabin.name} in {area.name}, which is not accessible to {cabin.age_group}")
+
+    for (day, period_id), slot_entries in preplaced.items():
+        cabin_counts: Dict[str, int] = {}
+        area_counts: Dict[str, int] = {}
+        for entry in slot_entries:
+            cabin_counts[entry["cabinId"]] = cabin_counts.get(entry["cabinId"], 0) + 1
+            area_counts[entry["areaId"]] = area_counts.get(entry["areaId"], 0) + 1
+        for cabin_id, count in cabin_counts.items():
+            if count > 1:
+                report.issues.append(FeasibilityIssue(
+                    "error", "double_assignment", f"Cabin {cabin_id} is pre-placed {count} times on day {day}, period {period_id}",
+                    day=day, period_id=period_id, cabin_id=cabin_id,
+                ))
+        for area_id, count in area_counts.items():
+            area = area_by_id[area_id]
+            if count > area.max_capacity:
+                report.issues.append(FeasibilityIssue(
+                    "error", "preplaced_over_capacity",
+                    f"Area {area.name} has {count}/{area.max_capacity} pre-placed cabins on day {day}, period {period_id}",
+                    day=day, period_id=period_id, area_id=area_id,
+                ))
+            for linked_id in area.linked_areas:
+                # Report a mutual link once, from its smaller id.
+                if linked_id not in area_counts or (area_id > linked_id and is_mutually_linked(area, linked_id, area_by_id)):
+                    continue
+                report.issues.append(FeasibilityIssue(
+                    "error", "linked_area_conflict",
+                    f"Linked areas {area_id} and {linked_id} are both pre-placed on day {day}, period {period_id}",
+                    day=day, period_id=period_id, area_id=area_id,
+                ))
+    return preplaced
+
+def analyze_slot(
+    period: Period,
+    cabins: List[Cabin],
+    areas: List[ActivityArea],
+    config: Dict[str, Any],
+    preplaced: List[Dict[str, Any]],
+    report: FeasibilityReport
+):
+    """Bound the demand of one period against the capacity of its open areas."""
+    periods = config.get("periods", [])
+    placed_cabins = {e["cabinId"] for e in preplaced}
+    placed_areas: Dict[str, int] = {}
+    for e in preplaced:
+        placed_areas[e["areaId"]] = placed_areas.get(e["areaId"], 0) + 1
+
+    # Remaining capacity of areas that are open and not excluded by a pre-placed linked area.
+    remaining: Dict[str, int] = {}
+    for area in areas:
+        if not is_area_available(area, periods, period.day, period.id):
+            continue
+        if any(placed_areas.get(linked_id) for linked_id in area.linked_areas):
+            continue
+        capacity = area.max_capacity - placed_areas.get(area.id, 0)
+        if capacity > 0:
+            remaining[area.id] = capacity
+
+    domains: Dict[str, List[str]] = {}
+    for cabin in cabins:
+        if cabin.id in placed_cabins or _is_blacked_out(cabin, period.day, period.id, config):
+            continue
+        domain = [a.id for a in get_candidate_areas(cabin, areas, periods, period.day, period.id) if a.id in remaining]
+        domains[cabin.id] = domain
+        if not domain:
+            report.issues.append(FeasibilityIssue(
+                "error", "empty_domain", f"{cabin.name} has no open area it may use during {period.name} (day {period.day})",
+                day=period.day, period_id=period.id, cabin_id=cabin.id,
+            ))
+
+    area_by_id = {a.id: a for a in areas}
+    groups = _linked_groups(list(remaining), area_by_id)
+    group_bounds = [_exclusive_capacity(group, remaining, area_by_id) for group in groups]
+
+    demand = len(domains)
+    capacity = sum(remaining.values())
+    exclusive_capacity = sum(group_bounds)
+    all_areas = set(remaining)
+    if demand <= exclusive_capacity and all(set(d) == all_areas for d in domains.values()):
+        assignable = demand
+    else:
+        assignable = _max_assignable(domains, remaining, groups, group_bounds)
+
+    report.slots.append(SlotCapacity(period.day, period.id, demand, capacity, exclusive_capacity, assignable))
+    if assignable < demand:
+        report.issues.append(FeasibilityIssue(
+            "error", "insufficient_capacity",
+            f"At most {assignable} of {demand} cabins can be placed during {period.name} (day {period.day})",
+            day=period.day, period_id=period.id,
+        ))
+
+def _linked_groups(area_ids: List[str], area_by_id: Dict[str, ActivityArea]) -> List[List[str]]:
+    """Connected components of the mutual-link graph among the given areas."""
+    open_ids = set(area_ids)
+    neighbours: Dict[str, Set[str]] = {a: set() for a in area_ids}
+    for a in area_ids:
+        for b in area_by_id[a].linked_areas:
+            if b in open_ids and is_mutually_linked(area_by_id[a], b, area_by_id):
+                neighbours[a].add(b)
+                neighbours[b].add(a)
+
+    groups, seen = [], set()
+    for a in area_ids:
+        if a in seen:
+            continue
+        group, stack = [], [a]
+        seen.add(a)
+        while stack:
+            current = stack.pop()
+            group.append(current)
+            for b in neighbours[current] - seen:
+                seen.add(b)
+                stack.append(b)
+        groups.append(group)
+    return groups
+
+def _exclusive_capacity(group: List[str], remaining: Dict[str, int], area_by_id: Dict[str, ActivityArea]) -> int:
+    """Largest capacity usable at once within a group of mutually linked areas."""
+    if len(group) == 1 or len(group) > MAX_EXACT_LINKED_GROUP:
+        return sum(remaining[a] for a in group)
+    best = 0
+    for size in range(1, len(group) + 1):
+        for subset in combinations(group, size):
+            if any(b in subset and is_mutually_linked(area_by_id[a], b, area_by_id) for a in subset for b in area_by_id[a].linked_areas):
+                continue
+            best = max(best, sum(remaining[a] for a in subset))
+    return best
+
+def _max_assignable(
+    domains: Dict[str, List[str]],
+    remaining: Dict[str, int],
+    groups: List[List[str]],
+    group_bounds: List[int]
+) -> int:
+    """Max-flow bound: source -> cabin -> area -> linked group -> sink."""
+    cabin_ids = list(domains)
+    area_ids = list(remaining)
+    source, sink = 0, 1
+    cabin_node = {c: 2 + i for i, c in enumerate(cabin_ids)}
+    area_node = {a: 2 + len(cabin_ids) + i for i, a in enumerate(area_ids)}
+    group_base = 2 + len(cabin_ids) + len(area_ids)
+    n = group_base + len(groups)
+
+    graph: List[List[List[int]]] = [[] for _ in range(n)]
+
+    def add_edge(u: int, v: int, capacity: int):
+        graph[u].append([v, capacity, len(graph[v])])
+        graph[v].append([u, 0, len(graph[u]) - 1])
+
+    for c in cabin_ids:
+        add_edge(source, cabin_node[c], 1)
+        for a in domains[c]:
+            add_edge(cabin_node[c], area_node[a], 1)
+    for g, group in enumerate(groups):
+        for a in group:
+            add_edge(area_node[a], group_base + g, remaining[a])
+        add_edge(group_base + g, sink, group_bounds[g])
+
+    return _dinic(graph, source, sink)
+
+def _dinic(graph: List[List[List[int]]], source: int, sink: int) -> int:
+    flow = 0
+    n = len(graph)
+    while True:
+        level = [-1] * n
+        level[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for v, capacity, _ in graph[u]:
+                if capacity > 0 and level[v] < 0:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        if level[sink] < 0:
+            return flow
+
+        pointer = [0] * n
+
+        def push(u: int, limit: int) -> int:
+            if u == sink:
+                return limit
+            while pointer[u] < len(graph[u]):
+                edge = graph[u][pointer[u]]
+                v, capacity, reverse = edge
+                if capacity > 0 and level[v] == level[u] + 1:
+                    pushed = push(v, min(limit, capacity))
+                    if pushed:
+                        edge[1] -= pushed
+                        graph[v][reverse][1] += pushed
+                        return pushed
+                pointer[u] += 1
+            return 0
+
+        while True:
+            pushed = push(source, float("inf"))
+            if not pushed:
+                break
+            flow += pushed
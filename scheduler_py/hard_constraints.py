@@ -1,54 +1,109 @@
 import random
-from typing import List, Dict, Any, Tuple
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Tuple, Callable, Optional
 
 from .models import Cabin, ActivityArea, Period, Assignment, DoubleBookingLikelihood
 from .utils import (
     get_area_utilization,
     get_last_cabin_area,
-    calculate_travel_time,
+    get_travel_matrix,
     has_cabin_used_area_recently,
 )
 
+@dataclass
+class HardConstraint:
+    """A single hard rule together with the metadata used to plan its evaluation."""
+    name: str
+    reason: str
+    cost: int
+    check: Callable[[Cabin, ActivityArea, Period, List[Assignment], Dict[str, Any], List[Period]], bool]
+    applies: Callable[[ActivityArea, Dict[str, Any], List[Period]], bool] = lambda area, config, periods: True
+
+@dataclass
+class ConstraintPlan:
+    """
+    Compiled per-area list of the hard constraints that can actually reject the area.
+    Checks are evaluated cheapest-and-most-selective first; the order is re-tuned
+    periodically from the rejection rates observed during the run.
+    """
+    area_id: str
+    constraints: List[HardConstraint]
+    reorder_interval: int = 32
+    calls: int = 0
+    evaluations: Dict[str, int] = field(default_factory=dict)
+    rejections: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for constraint in self.constraints:
+            self.evaluations.setdefault(constraint.name, 0)
+            self.rejections.setdefault(constraint.name, 0)
+        self.reorder()
+
+    def evaluate(
+        self,
+        cabin: Cabin,
+        area: ActivityArea,
+        period: Period,
+        assignments: List[Assignment],
+        config: Dict[str, Any],
+        periods: List[Period]
+    ) -> Tuple[bool, str]:
+        """Run the planned checks, stopping at the first one that rejects."""
+        self.calls += 1
+        if self.calls % self.reorder_interval == 0:
+            self.reorder()
+
+        for constraint in self.constraints:
+            self.evaluations[constraint.name] += 1
+            if not constraint.check(cabin, area, period, assignments, config, periods):
+                self.rejections[constraint.name] += 1
+                return False, constraint.reason
+        return True, "All hard constraints satisfied"
+
+    def reorder(self):
+        """Order checks by expected cost per rejection (smoothed rejection rate)."""
+        def expected_cost(constraint: HardConstraint) -> float:
+            rejection_rate = (self.rejections[constraint.name] + 1) / (self.evaluations[constraint.name] + 2)
+            return constraint.cost / rejection_rate
+        self.constraints.sort(key=expected_cost)
+
 def check_hard_constraints(
     cabin: Cabin,
     area: ActivityArea,
     period: Period,
     assignments: List[Assignment],
     config: Dict[str, Any],
-    periods: List[Period]
+    periods: List[Period],
+    plan: Optional[ConstraintPlan] = None
 ) -> Tuple[bool, str]:
     """
     Check if a cabin can be assigned to an area during a period based on all hard constraints.
     Returns a tuple of (isValid, reason).
-    """
-    if is_cabin_already_assigned(cabin.id, period.day, period.id, assignments):
-        return False, "Cabin already assigned during this period"
-
-    if not check_area_capacity(area, period.day, period.id, assignments):
-        return False, "Area at maximum capacity"
-
-    if not check_area_conflicts(area, period.day, period.id, assignments):
-        return False, "Area conflict detected"
-
-    if not check_travel_time_constraints(cabin, area, period, assignments, config, periods):
-        return False, "Excessive travel time between areas"
 
-    if not check_fixed_area_closures(area, period):
-        return False, "Area closed during this period"
-
-    if not check_no_repeats_rule(cabin.id, area.id, period.day, assignments, config):
-        return False, "Cabin used this area too recently"
+    When a compiled plan for the area is given, only the constraints that can apply to it
+    are evaluated, in adaptive order. The validity result is the same either way, but the
+    reason reported for an invalid assignment may name a different failing constraint.
+    """
+    if plan is not None:
+        return plan.evaluate(cabin, area, period, assignments, config, periods)
 
-    if not check_buffer_periods(area, period.day, period.id, assignments):
-        return False, "Buffer period required after previous use"
+    for constraint in HARD_CONSTRAINTS:
+        if not constraint.check(cabin, area, period, assignments, config, periods):
+            return False, constraint.reason
 
-    if not check_cabin_blackout_periods(cabin, period):
-        return False, "Cabin blacked out during this period"
+    return True, "All hard constraints satisfied"
 
-    if not check_cabin_blackout_areas(cabin, area):
-        return False, "Cabin blacked out from this area"
+def compile_constraint_plan(area: ActivityArea, config: Dict[str, Any], periods: List[Period]) -> ConstraintPlan:
+    """Compile the hard-constraint plan for a single area, dropping rules that cannot apply."""
+    return ConstraintPlan(
+        area_id=area.id,
+        constraints=[c for c in HARD_CONSTRAINTS if c.applies(area, config, periods)],
+    )
 
-    return True, "All hard constraints satisfied"
+def compile_constraint_plans(config: Dict[str, Any]) -> Dict[str, ConstraintPlan]:
+    """Compile a hard-constraint plan for every configured area."""
+    periods = config.get("periods", [])
+    return {area.id: compile_constraint_plan(area, config, periods) for area in config.get("areas", [])}
 
 def is_cabin_already_assigned(cabin_id: str, day: int, period_id: str, assignments: List[Assignment]) -> bool:
     """Check if a cabin is already assigned during a specific period."""
@@ -74,11 +129,10 @@ def check_travel_time_constraints(cabin: Cabin, area: ActivityArea, period: Peri
     if not last_area_id:
         return True
 
-    last_area = next((a for a in config.get("areas", []) if a.id == last_area_id), None)
-    if not last_area:
+    travel_time = get_travel_matrix(config).get(last_area_id, area.id)
+    if travel_time is None:
         return True
 
-    travel_time = calculate_travel_time(last_area, area)
     max_allowed_time = config.get("allowedTransitionTime", 30)
     return travel_time <= max_allowed_time
 
@@ -115,6 +169,79 @@ def is_double_booking_allowed(area: ActivityArea) -> bool:
         return random.random() < 0.3  # 30% chance
     return False
 
+def can_area_be_closed(area: ActivityArea, config: Dict[str, Any], periods: List[Period]) -> bool:
+    """Check if any period closes the area."""
+    return any(area.id in p.blackout_areas for p in periods)
+
+def can_travel_time_be_exceeded(area: ActivityArea, config: Dict[str, Any], periods: List[Period]) -> bool:
+    """Check if travelling to the area from any other area can exceed the allowed transition time."""
+    max_allowed_time = config.get("allowedTransitionTime", 30)
+    return get_travel_matrix(config).max_to(area.id) > max_allowed_time
+
+def can_cabin_be_blacked_out_of_period(area: ActivityArea, config: Dict[str, Any], periods: List[Period]) -> bool:
+    """Check if any cabin has period blackouts."""
+    return any(c.restrictions.blackout_periods for c in config.get("cabins", []))
+
+def can_cabin_be_blacked_out_of_area(area: ActivityArea, config: Dict[str, Any], periods: List[Period]) -> bool:
+    """Check if any cabin is blacked out from the area."""
+    return any(area.id in c.restrictions.blackout_areas for c in config.get("cabins", []))
+
+# Hard constraints in their reference evaluation order. Costs are rough relative
+# estimates: static lookups are cheap, history scans are not.
+HARD_CONSTRAINTS: List[HardConstraint] = [
+    HardConstraint(
+        "already_assigned", "Cabin already assigned during this period", 3,
+        lambda cabin, area, period, assignments, config, periods:
+            not is_cabin_already_assigned(cabin.id, period.day, period.id, assignments),
+    ),
+    HardConstraint(
+        "area_capacity", "Area at maximum capacity", 3,
+        lambda cabin, area, period, assignments, config, periods:
+            check_area_capacity(area, period.day, period.id, assignments),
+    ),
+    HardConstraint(
+        "area_conflicts", "Area conflict detected", 3,
+        lambda cabin, area, period, assignments, config, periods:
+            check_area_conflicts(area, period.day, period.id, assignments),
+        lambda area, config, periods: bool(area.linked_areas),
+    ),
+    HardConstraint(
+        "travel_time", "Excessive travel time between areas", 8,
+        check_travel_time_constraints,
+        can_travel_time_be_exceeded,
+    ),
+    HardConstraint(
+        "fixed_area_closures", "Area closed during this period", 1,
+        lambda cabin, area, period, assignments, config, periods:
+            check_fixed_area_closures(area, period),
+        can_area_be_closed,
+    ),
+    HardConstraint(
+        "no_repeats", "Cabin used this area too recently", 3,
+        lambda cabin, area, period, assignments, config, periods:
+            check_no_repeats_rule(cabin.id, area.id, period.day, assignments, config),
+        lambda area, config, periods: config.get("noRepeatsDays", 3) > 0,
+    ),
+    HardConstraint(
+        "buffer_periods", "Buffer period required after previous use", 3,
+        lambda cabin, area, period, assignments, config, periods:
+            check_buffer_periods(area, period.day, period.id, assignments),
+        lambda area, config, periods: area.buffer_periods != 0,
+    ),
+    HardConstraint(
+        "cabin_blackout_periods", "Cabin blacked out during this period", 1,
+        lambda cabin, area, period, assignments, config, periods:
+            check_cabin_blackout_periods(cabin, period),
+        can_cabin_be_blacked_out_of_period,
+    ),
+    HardConstraint(
+        "cabin_blackout_areas", "Cabin blacked out from this area", 1,
+        lambda cabin, area, period, assignments, config, periods:
+            check_cabin_blackout_areas(cabin, area),
+        can_cabin_be_blacked_out_of_area,
+    ),
+]
+
 def is_area_alternating_days(area: ActivityArea) -> bool:
     """Check if area alternates days and is exempt from other rules."""
     return area.alternates_days
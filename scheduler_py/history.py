@@ -0,0 +1,44 @@
+import json
+import os
+import tempfile
+from typing import List, Iterator, Optional
+
+from .models import Assignment
+
+class AssignmentSpillStore:
+    """
+    Append-only on-disk store (JSON lines) for assignments that have left the
+    rolling scheduling horizon. Assignments are read back lazily.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.is_temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="camp-schedule-", suffix=".jsonl")
+            os.close(fd)
+        self.path = path
+        self.count = 0
+        # Start from an empty store; a previous run's spill file is not part of this schedule.
+        open(self.path, "w").close()
+
+    def append(self, assignments: List[Assignment]):
+        """Append assignments to the end of the store."""
+        if not assignments:
+            return
+        with open(self.path, "a") as f:
+            for assignment in assignments:
+                f.write(json.dumps(assignment.__dict__) + "\n")
+        self.count += len(assignments)
+
+    def __iter__(self) -> Iterator[Assignment]:
+        with open(self.path) as f:
+            for line in f:
+                yield Assignment(**json.loads(line))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        """Remove the store from disk if it was created as a temporary file."""
+        if self.is_temporary and os.path.exists(self.path):
+            os.remove(self.path)
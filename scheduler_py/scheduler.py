@@ -1,11 +1,17 @@
 import time
 import json
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Iterator, Set, Tuple
 
 from .models import Assignment, Cabin, Period, ActivityArea
-from .hard_constraints import check_hard_constraints, is_double_booking_allowed
-from .soft_constraints import rank_candidate_areas, apply_cabin_merging
-from .utils import get_candidate_areas, get_area_utilization
+from .allocation import allocate_choice_periods
+from .backends import create_backend, DEFAULT_BACKEND
+from .hard_constraints import is_double_booking_allowed
+from .diff import diff_schedules, SchedulePatch
+from .feasibility import analyze_feasibility, FeasibilityReport, InfeasibleScheduleError
+from .history import AssignmentSpillStore
+from .evaluation import ScheduleEvaluator, ScheduleEvaluation
+from .soft_constraints import apply_cabin_merging
 
 class CampScheduler:
     """Main scheduler class for camp activity assignments."""
@@ -16,33 +22,40 @@ class CampScheduler:
         self.cabin_history: Dict[str, List[Assignment]] = {}
         self.area_utilization: Dict[str, int] = {}
         self.day_assignments: Dict[int, List[Assignment]] = {}
+        self.feasibility_report: Optional[FeasibilityReport] = None
+        self.backend = create_backend(config.get("backend", DEFAULT_BACKEND), config)
+
+        # Rolling-horizon mode keeps only the constraint look-back window in memory
+        # and spills older days to disk.
+        rolling_horizon = config.get("rollingHorizon")
+        self.spill_store: Optional[AssignmentSpillStore] = None
+        self.horizon_days = 0
+        self.horizon_day: Optional[int] = None
+        # Ids of assignments kept in memory after they were already spilled.
+        self.spilled_ids: Set[int] = set()
+        self.period_start_times = {(p.day, p.id): p.start_time for p in config.get("periods", [])}
+        if rolling_horizon:
+            options = rolling_horizon if isinstance(rolling_horizon, dict) else {}
+            self.spill_store = AssignmentSpillStore(options.get("spillPath"))
+            self.horizon_days = max(config.get("noRepeatsDays", 3), 2, options.get("windowDays", 0))
         self.scheduling_stats = {
             "total_assignments": 0,
             "failed_assignments": 0,
             "constraint_violations": 0,
+            "periods_scheduled": 0,
+            "cancelled": False,
             "start_time": None,
             "end_time": None,
         }
 
-    def schedule(self) -> Dict[str, Any]:
-        """Main scheduling method - orchestrates the entire scheduling process."""
-        print("Starting camp scheduling...")
-        self.scheduling_stats["start_time"] = time.time()
-
+    def schedule(self, cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Main scheduling method - runs the scheduling process to completion via iter_schedule()."""
         try:
-            processed_cabins = apply_cabin_merging(self.config.get("cabins", []), self.config)
-            self.process_manual_overrides()
-            self.process_choice_periods()
-            self.run_scheduling_loop(processed_cabins)
-            self.validate_final_schedule()
-
-            self.scheduling_stats["end_time"] = time.time()
-            self.scheduling_stats["total_assignments"] = len(self.assignments)
-
-            print(f"Scheduling completed. Total assignments: {len(self.assignments)}")
+            for _ in self.iter_schedule(cancel):
+                pass
 
             return {
-                "assignments": self.assignments,
+                "assignments": self.get_all_assignments(),
                 "statistics": self.get_statistics(),
                 "success": True,
             }
@@ -50,12 +63,66 @@ class CampScheduler:
             print(f"Scheduling failed: {e}")
             self.scheduling_stats["end_time"] = time.time()
             return {
-                "assignments": self.assignments,
+                "assignments": self.get_all_assignments(),
                 "statistics": self.get_statistics(),
                 "success": False,
                 "error": str(e),
             }
 
+    def iter_schedule(self, cancel: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Orchestrate the scheduling process, yielding results as soon as they are committed.
+
+        The first item holds the manual overrides and choice periods (with `period` None),
+        followed by one item per period with the assignments made for it. Every item carries
+        the running statistics. Once `cancel` is set, no further periods are scheduled.
+        """
+        print("Starting camp scheduling...")
+        self.scheduling_stats["start_time"] = time.time()
+
+        if self.config.get("feasibilityCheck"):
+            self.check_feasibility()
+
+        processed_cabins = apply_cabin_merging(self.config.get("cabins", []), self.config)
+        self.process_manual_overrides()
+        self.process_choice_periods()
+        if self.assignments:
+            yield self._schedule_update(None, list(self.assignments))
+
+        for period, assignments in self.iter_scheduling_loop(processed_cabins, cancel):
+            yield self._schedule_update(period, assignments)
+
+        self.validate_final_schedule()
+        if "previousSchedule" in self.config:
+            self.scheduling_stats["churn"] = self.diff_from_previous().get_churn()
+
+        self.scheduling_stats["end_time"] = time.time()
+        self.scheduling_stats["total_assignments"] = self.count_assignments()
+
+        print(f"Scheduling completed. Total assignments: {self.count_assignments()}")
+
+    def _schedule_update(self, period: Optional[Period], assignments: List[Assignment]) -> Dict[str, Any]:
+        """Build a streamed scheduling result."""
+        self.scheduling_stats["total_assignments"] = self.count_assignments()
+        return {
+            "period": period,
+            "assignments": assignments,
+            "statistics": self.get_statistics(),
+        }
+
+    def check_feasibility(self) -> FeasibilityReport:
+        """Run the pre-solve feasibility analysis; in strict mode, stop if it finds errors."""
+        report = analyze_feasibility(self.config)
+        self.feasibility_report = report
+        self.scheduling_stats["feasibility_errors"] = len(report.errors)
+        self.scheduling_stats["feasibility_warnings"] = len(report.warnings)
+        for issue in report.issues:
+            print(f"{issue.severity.capitalize()}: {issue.message}")
+        print(report.summary())
+        if self.config.get("feasibilityCheck") == "strict" and not report.feasible:
+            raise InfeasibleScheduleError(report.summary())
+        return report
+
     def process_manual_overrides(self):
         """Process manual overrides from configuration."""
         manual_overrides = self.config.get("manualOverrides", [])
@@ -72,8 +139,18 @@ class CampScheduler:
         print(f"Processed {len(manual_overrides)} manual overrides")
 
     def process_choice_periods(self):
-        """Process choice periods from configuration."""
-        choice_periods = self.config.get("choicePeriods", [])
+        """Process choice periods from configuration, allocating any ranked choice requests."""
+        choice_periods = list(self.config.get("choicePeriods", []))
+        if self.config.get("choiceRequests"):
+            allocation = allocate_choice_periods(self.config)
+            choice_periods += allocation.assignments
+            self.scheduling_stats["choice_allocation"] = {
+                "allocated": len(allocation.assignments),
+                "unassigned": len(allocation.unassigned),
+                "skipped": len(allocation.skipped),
+                "rank_counts": dict(sorted(allocation.rank_counts.items())),
+            }
+            print(f"Allocated {len(allocation.assignments)} choice requests, {len(allocation.unassigned)} unassigned")
         for choice in choice_periods:
             assignment = Assignment(
                 cabin_id=choice["cabinId"],
@@ -88,13 +165,30 @@ class CampScheduler:
 
     def run_scheduling_loop(self, cabins: List[Cabin]):
         """Main scheduling loop - assigns cabins to areas for each period."""
+        for _ in self.iter_scheduling_loop(cabins):
+            pass
+
+    def iter_scheduling_loop(
+        self, cabins: List[Cabin], cancel: Optional[threading.Event] = None
+    ) -> Iterator[Tuple[Period, List[Assignment]]]:
+        """Assign cabins to areas period by period, yielding each period's new assignments."""
         sorted_periods = self.sort_periods_chronologically()
 
         for period in sorted_periods:
+            if cancel is not None and cancel.is_set():
+                print("Scheduling cancelled")
+                self.scheduling_stats["cancelled"] = True
+                return
+
             print(f"Scheduling period: {period.name} (Day {period.day})")
+            if self.spill_store is not None and period.day != self.horizon_day:
+                self.advance_horizon(period.day)
+            period_assignments: List[Assignment] = []
 
             if self.is_period_fully_assigned(period):
                 print(f"Period {period.name} already fully assigned, skipping")
+                self.scheduling_stats["periods_scheduled"] += 1
+                yield period, period_assignments
                 continue
 
             available_cabins = self.get_available_cabins_for_period(cabins, period)
@@ -105,25 +199,29 @@ class CampScheduler:
                 if assignment:
                     self.assignments.append(assignment)
                     self.update_scheduling_state(assignment)
+                    period_assignments.append(assignment)
                     print(f"Assigned {cabin.name} to {assignment.area_id} for {period.name}")
                 else:
                     self.scheduling_stats["failed_assignments"] += 1
                     print(f"Warning: Failed to assign {cabin.name} for {period.name}")
 
+            self.scheduling_stats["periods_scheduled"] += 1
+            yield period, period_assignments
+
     def sort_periods_chronologically(self) -> List[Period]:
         """Sort periods chronologically by day and start time."""
         return sorted(self.config.get("periods", []), key=lambda p: (p.day, p.start_time))
 
     def is_period_fully_assigned(self, period: Period) -> bool:
         """Check if a period is already fully assigned."""
-        assigned_cabins_count = sum(1 for a in self.assignments if a.day == period.day and a.period_id == period.id)
+        assigned_cabins_count = self.backend.count_period_assignments(period.day, period.id)
         return assigned_cabins_count >= len(self.config.get("cabins", []))
 
     def get_available_cabins_for_period(self, cabins: List[Cabin], period: Period) -> List[Cabin]:
         """Get available cabins for a specific period."""
         available = []
         for cabin in cabins:
-            is_assigned = any(a.cabin_id == cabin.id and a.day == period.day and a.period_id == period.id for a in self.assignments)
+            is_assigned = self.backend.is_cabin_assigned(cabin.id, period.day, period.id)
             is_blacked_out = self.is_cabin_blacked_out(cabin, period)
             if not is_assigned and not is_blacked_out:
                 available.append(cabin)
@@ -140,9 +238,7 @@ class CampScheduler:
 
     def assign_cabin_to_area(self, cabin: Cabin, period: Period) -> Optional[Assignment]:
         """Assign a cabin to an area during a specific period."""
-        candidate_areas = get_candidate_areas(
-            cabin, self.config.get("areas", []), self.config.get("periods", []), period.day, period.id
-        )
+        candidate_areas = self.backend.candidate_areas(cabin, period)
         if not candidate_areas:
             print(f"Warning: No candidate areas available for {cabin.name} during {period.name}")
             return None
@@ -150,7 +246,7 @@ class CampScheduler:
         # Apply hard constraints
         valid_areas = []
         for area in candidate_areas:
-            is_valid, reason = check_hard_constraints(cabin, area, period, self.assignments, self.config, self.config.get("periods", []))
+            is_valid, reason = self.backend.check(cabin, area, period, self.assignments)
             if is_valid:
                 valid_areas.append(area)
 
@@ -160,7 +256,7 @@ class CampScheduler:
             return None
 
         # Rank candidate areas
-        ranked_areas = rank_candidate_areas(valid_areas, cabin, period, self.assignments, self.config, self.config.get("periods", []))
+        ranked_areas = self.backend.rank(valid_areas, cabin, period, self.assignments)
 
         # Try to assign to the best area
         for area in ranked_areas:
@@ -178,7 +274,7 @@ class CampScheduler:
 
     def can_assign_cabin_to_area(self, cabin: Cabin, area: ActivityArea, period: Period, allow_double_booking: bool = False) -> bool:
         """Check if a cabin can be assigned to an area."""
-        current_utilization = get_area_utilization(area.id, self.assignments, period.day, period.id)
+        current_utilization = self.backend.get_area_utilization(area.id, period.day, period.id)
         if allow_double_booking:
             return current_utilization < area.max_capacity * 1.5
         else:
@@ -190,6 +286,82 @@ class CampScheduler:
         key = f"{assignment.area_id}_{assignment.day}_{assignment.period_id}"
         self.area_utilization[key] = self.area_utilization.get(key, 0) + 1
         self.day_assignments.setdefault(assignment.day, []).append(assignment)
+        self.backend.record(assignment)
+
+    def advance_horizon(self, day: int):
+        """
+        Spill assignments older than the rolling look-back window to the on-disk store,
+        in chronological order. Each cabin's most recent assignment is spilled with its
+        day but also kept in memory, since the travel rules look back to the cabin's last area.
+        """
+        self.horizon_day = day
+        cutoff = day - self.horizon_days
+        if not any(d < cutoff for d in self.day_assignments):
+            return
+
+        latest: Dict[str, Assignment] = {}
+        for a in self.assignments:
+            if a.day < cutoff:
+                current = latest.get(a.cabin_id)
+                if current is None or self.get_chronological_key(a) > self.get_chronological_key(current):
+                    latest[a.cabin_id] = a
+        retained = {id(a) for a in latest.values()}
+
+        newly_expired = [a for a in self.assignments if a.day < cutoff and id(a) not in self.spilled_ids]
+        self.spill_store.append(sorted(newly_expired, key=self.get_chronological_key))
+        dropped = [a for a in self.assignments if a.day < cutoff and id(a) not in retained]
+        self.assignments = [a for a in self.assignments if a.day >= cutoff or id(a) in retained]
+        self.spilled_ids = retained
+        self.backend.forget(dropped)
+
+        for expired_day in [d for d in self.day_assignments if d < cutoff]:
+            del self.day_assignments[expired_day]
+        for cabin_id, history in self.cabin_history.items():
+            self.cabin_history[cabin_id] = [a for a in history if a.day >= cutoff or id(a) in retained]
+        for assignment in dropped:
+            key = f"{assignment.area_id}_{assignment.day}_{assignment.period_id}"
+            self.area_utilization[key] -= 1
+            if self.area_utilization[key] == 0:
+                del self.area_utilization[key]
+
+    def get_chronological_key(self, assignment: Assignment) -> Tuple[int, int]:
+        """Sort key ordering assignments by day and period start time."""
+        return assignment.day, self.period_start_times.get((assignment.day, assignment.period_id), 0)
+
+    def close(self):
+        """Release resources held by the scheduler, such as a temporary spill file."""
+        if self.spill_store is not None:
+            self.spill_store.close()
+
+    def __enter__(self) -> "CampScheduler":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def iter_all_assignments(self) -> Iterator[Assignment]:
+        """
+        Iterate over every assignment. In rolling-horizon mode spilled assignments are
+        read back from disk first and the whole schedule comes out in chronological order.
+        """
+        if self.spill_store is None:
+            yield from self.assignments
+            return
+        yield from self.spill_store
+        in_memory = [a for a in self.assignments if id(a) not in self.spilled_ids]
+        yield from sorted(in_memory, key=self.get_chronological_key)
+
+    def get_all_assignments(self) -> List[Assignment]:
+        """Get every assignment, including those spilled to disk."""
+        if self.spill_store is None:
+            return self.assignments
+        return list(self.iter_all_assignments())
+
+    def count_assignments(self) -> int:
+        """Count every assignment, including those spilled to disk."""
+        if self.spill_store is None:
+            return len(self.assignments)
+        return len(self.spill_store) + len(self.assignments) - len(self.spilled_ids)
 
     def validate_final_schedule(self):
         """Validate the final schedule for consistency."""
@@ -198,17 +370,20 @@ class CampScheduler:
 
         # Check for double assignments
         assignment_keys = set()
-        for assignment in self.assignments:
+        utilization_counts: Dict[Tuple[str, int, str], int] = {}
+        for assignment in self.iter_all_assignments():
             key = (assignment.cabin_id, assignment.day, assignment.period_id)
             if key in assignment_keys:
                 print(f"Error: Double assignment detected for cabin {assignment.cabin_id} on day {assignment.day}, period {assignment.period_id}")
                 violations += 1
             assignment_keys.add(key)
+            slot_key = (assignment.area_id, assignment.day, assignment.period_id)
+            utilization_counts[slot_key] = utilization_counts.get(slot_key, 0) + 1
 
         # Check area capacity violations
         for area in self.config.get("areas", []):
             for period in self.config.get("periods", []):
-                utilization = get_area_utilization(area.id, self.assignments, period.day, period.id)
+                utilization = utilization_counts.get((area.id, period.day, period.id), 0)
                 if utilization > area.max_capacity:
                     print(f"Error: Area {area.name} over capacity: {utilization}/{area.max_capacity} on day {period.day}, period {period.id}")
                     violations += 1
@@ -233,21 +408,37 @@ class CampScheduler:
         else:
             stats["success_rate"] = 0
 
+        stats["backend"] = self.backend.name
+        stats.update(self.backend.get_statistics())
+
+        if self.spill_store is not None:
+            stats["spilled_assignments"] = len(self.spill_store)
+
         return stats
 
+    def evaluate_schedule(self) -> ScheduleEvaluation:
+        """Score the current schedule with the whole-schedule objective and fairness metrics."""
+        return ScheduleEvaluator(self.config).evaluate(self.get_all_assignments())
+
+    def diff_from_previous(self) -> SchedulePatch:
+        """Compute the patch from the configured previous schedule to the current one."""
+        return diff_schedules(self.config.get("previousSchedule", []), self.iter_all_assignments())
+
     def export_schedule(self, format: str = "json") -> str:
         """Export schedule to various formats."""
         if format == "json":
-            return json.dumps([a.__dict__ for a in self.assignments], indent=2)
+            return json.dumps([a.__dict__ for a in self.iter_all_assignments()], indent=2)
         elif format == "csv":
             return self.export_to_csv()
+        elif format == "patch":
+            return self.diff_from_previous().to_json()
         else:
             raise ValueError(f"Unsupported export format: {format}")
 
     def export_to_csv(self) -> str:
         """Export schedule to CSV format."""
         lines = ["Day,Period,Cabin,Area,Type"]
-        for a in self.assignments:
+        for a in self.iter_all_assignments():
             type_str = "Manual" if a.is_manual_override else "Choice" if a.is_choice_period else "Auto"
             lines.append(f"{a.day},{a.period_id},{a.cabin_id},{a.area_id},{type_str}")
         return "\n".join(lines)
@@ -2,7 +2,7 @@ from typing import List, Dict, Any
 from .models import ActivityArea, Cabin, Period, Assignment
 from .utils import (
     get_last_cabin_area,
-    calculate_travel_time,
+    get_travel_matrix,
     get_area_utilization,
 )
 
@@ -101,11 +101,10 @@ def calculate_travel_time_score(area: ActivityArea, cabin: Cabin, period: Period
     if not last_area_id:
         return 0.0
 
-    last_area = next((a for a in config.get("areas", []) if a.id == last_area_id), None)
-    if not last_area:
+    travel_time = get_travel_matrix(config).get(last_area_id, area.id)
+    if travel_time is None:
         return 0.0
 
-    travel_time = calculate_travel_time(last_area, area)
     max_allowed_time = config.get("allowedTransitionTime", 30)
 
     return 10 if travel_time <= max_allowed_time else -15
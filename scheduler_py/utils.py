@@ -1,4 +1,8 @@
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
 from .models import Period, ActivityArea, Cabin, Assignment
 
 def get_periods_per_day(periods: List[Period]) -> float:
@@ -27,6 +31,77 @@ def calculate_travel_time(area1: ActivityArea, area2: ActivityArea) -> int:
     base_travel_time = abs(area1.travel_time - area2.travel_time)
     return max(base_travel_time, 5)  # Minimum 5 minutes
 
+@dataclass
+class TravelMatrix:
+    """All-pairs travel times (in minutes) between activity areas."""
+    area_index: Dict[str, int]
+    minutes: np.ndarray
+    areas: List[ActivityArea]
+    travel_graph: Optional[List[Dict[str, Any]]] = None
+
+    def get(self, from_area_id: str, to_area_id: str) -> Optional[float]:
+        """Travel time between two areas, or None if either area is unknown."""
+        i = self.area_index.get(from_area_id)
+        j = self.area_index.get(to_area_id)
+        if i is None or j is None:
+            return None
+        return float(self.minutes[i, j])
+
+    def max_to(self, area_id: str) -> float:
+        """Longest travel time from any area to the given area."""
+        j = self.area_index.get(area_id)
+        if j is None or not len(self.minutes):
+            return 0.0
+        return float(self.minutes[:, j].max())
+
+def build_travel_matrix(areas: List[ActivityArea], travel_graph: Optional[List[Dict[str, Any]]] = None) -> TravelMatrix:
+    """
+    Build the all-pairs travel time matrix.
+
+    With a travel graph (a list of {"from", "to", "minutes"} walking paths, usable in
+    both directions) shortest paths are computed with Floyd-Warshall; unreachable pairs
+    are infinite. Without one, the legacy `calculate_travel_time` formula is used.
+    """
+    area_index = {a.id: i for i, a in enumerate(areas)}
+    if not travel_graph:
+        travel_times = np.array([a.travel_time for a in areas], dtype=np.float64)
+        minutes = np.maximum(np.abs(travel_times[:, None] - travel_times[None, :]), 5)
+        return TravelMatrix(area_index, minutes, areas, travel_graph)
+
+    minutes = np.full((len(areas), len(areas)), np.inf)
+    np.fill_diagonal(minutes, 0)
+    for edge in travel_graph:
+        i = area_index.get(edge["from"])
+        j = area_index.get(edge["to"])
+        if i is None or j is None:
+            raise ValueError(f"Travel graph edge references unknown area: {edge['from']} -> {edge['to']}")
+        minutes[i, j] = minutes[j, i] = min(minutes[i, j], edge["minutes"])
+
+    for k in range(len(areas)):
+        minutes = np.minimum(minutes, minutes[:, k, None] + minutes[None, k, :])
+    return TravelMatrix(area_index, minutes, areas, travel_graph)
+
+# Compiled travel matrices keyed by the area travel times and travel graph they were
+# built from, so edits to a config are picked up on the next lookup.
+TRAVEL_MATRIX_CACHE_SIZE = 16
+_travel_matrix_cache: Dict[Tuple[Any, ...], TravelMatrix] = {}
+
+def get_travel_matrix(config: Dict[str, Any]) -> TravelMatrix:
+    """Get the travel time matrix for a config, compiling it on first use."""
+    areas = config.get("areas", [])
+    travel_graph = config.get("travelGraph")
+    key = (
+        tuple((a.id, a.travel_time) for a in areas),
+        tuple((edge["from"], edge["to"], edge["minutes"]) for edge in travel_graph or ()),
+    )
+    matrix = _travel_matrix_cache.get(key)
+    if matrix is None:
+        matrix = build_travel_matrix(areas, travel_graph)
+        if len(_travel_matrix_cache) >= TRAVEL_MATRIX_CACHE_SIZE:
+            _travel_matrix_cache.clear()
+        _travel_matrix_cache[key] = matrix
+    return matrix
+
 def get_last_cabin_area(cabin_id: str, assignments: List[Assignment], current_day: int, current_period_id: str, periods: List[Period]) -> Optional[str]:
     """Get the last area a cabin was assigned to."""
     cabin_assignments = sorted(